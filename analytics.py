@@ -0,0 +1,375 @@
+"""
+Incremental analytics for SW BALOTO.
+Keeps running counters per game that are updated one draw at a time, so the
+predictive views cost O(ball pool) to read instead of O(history).
+Pair co-occurrences are kept as a dense matrix and triples as sparse counts,
+which answer top-k, companion and conditional probability queries directly.
+"""
+import bisect
+import heapq
+from collections import Counter, defaultdict
+from itertools import chain, combinations
+
+import numpy as np
+
+import logic
+import vectorized
+from metrics import timed
+
+# Highest ball number per game type
+MAX_NUMBERS = {'baloto': 43, 'revancha': 43, 'miloto': 39}
+
+
+class GameAnalytics:
+    """
+    Running statistics for the draws of one game partition.
+    The partition calls `add` after every insertion with the index at which
+    the draw landed in its date-sorted list.
+    """
+
+    def __init__(self, partition):
+        self.partition = partition
+        self.game_type = partition.game_type
+        self.max_num = MAX_NUMBERS.get(self.game_type, 39)
+        self._reset()
+
+    def _reset(self):
+        self.number_freq = Counter()
+        self.super_freq = Counter()
+        # pair_counts[a, b]: draws with both a and b (frequencies on the diagonal);
+        # triple_freq[a][(b, c)]: draws with a, b and c, for b < c. Each triple is
+        # kept under its three numbers so companion lookups read a single Counter
+        self.pair_counts = np.zeros((self.max_num + 1, self.max_num + 1), dtype=np.int64)
+        self.triple_freq = defaultdict(Counter)
+        self.position_freq = [Counter() for _ in range(5)]
+        self.sum_freq = Counter()
+
+        # Latest date each number / super ball was drawn
+        self.last_seen = {}
+        self.super_last_seen = {}
+
+        # Counts for the older and newer halves of history (trend analysis)
+        self.first_half_freq = Counter()
+        self.second_half_freq = Counter()
+
+    def __len__(self):
+        return len(self.partition)
+
+    def copy(self, partition):
+        """
+        Independent copy of the accumulators, bound to a copy of the partition.
+        """
+        clone = GameAnalytics.__new__(GameAnalytics)
+        clone.partition = partition
+        clone.game_type = self.game_type
+        clone.max_num = self.max_num
+        clone.number_freq = self.number_freq.copy()
+        clone.super_freq = self.super_freq.copy()
+        clone.pair_counts = self.pair_counts.copy()
+        clone.triple_freq = defaultdict(Counter, {num: counts.copy() for num, counts in self.triple_freq.items()})
+        clone.position_freq = [counter.copy() for counter in self.position_freq]
+        clone.sum_freq = self.sum_freq.copy()
+        clone.last_seen = dict(self.last_seen)
+        clone.super_last_seen = dict(self.super_last_seen)
+        clone.first_half_freq = self.first_half_freq.copy()
+        clone.second_half_freq = self.second_half_freq.copy()
+        return clone
+
+    def add(self, draw, idx):
+        """
+        Updates every accumulator with a draw inserted at position `idx`.
+        """
+        numbers = sorted(draw['numbers'])
+        date = draw.get('date', '')
+
+        self.number_freq.update(numbers)
+        self.sum_freq[sum(numbers)] += 1
+
+        # Draws are validated before they reach the store (store.validate_draw);
+        # a number out of range would wrap the flat index into unrelated cells
+        assert all(1 <= num <= self.max_num for num in numbers), f'Number out of range: {numbers}'
+        # Flat cell indices of every (a, b) of the draw; cheaper than np.ix_
+        drawn = np.array(numbers, dtype=np.int64)
+        self.pair_counts.reshape(-1)[(drawn[:, None] * len(self.pair_counts) + drawn).ravel()] += 1
+        self._add_triples((triple, 1) for triple in combinations(numbers, 3))
+
+        for pos, num in enumerate(numbers[:5]):
+            self.position_freq[pos][num] += 1
+
+        for num in numbers:
+            if date >= self.last_seen.get(num, ''):
+                self.last_seen[num] = date
+
+        super_num = draw.get('super')
+        if super_num is not None:
+            self.super_freq[super_num] += 1
+            if date >= self.super_last_seen.get(super_num, ''):
+                self.super_last_seen[super_num] = date
+
+        self._rebalance_halves(draw, idx)
+
+    def rebuild(self):
+        """
+        Recomputes every accumulator from the partition in bulk.
+        Used after loading many draws at once, where it is much cheaper than
+        calling `add` per draw.
+        """
+        self._reset()
+        draws = self.partition.draws
+        try:
+            self._rebuild_counts_vectorized(draws)
+        except (ValueError, OverflowError):
+            # Some draw does not have exactly five numbers, or one above 255
+            self._reset()
+            self._rebuild_counts(draws)
+
+        # Draws are sorted by date, so later entries hold the latest date
+        self.last_seen = {num: draw.get('date', '') for draw in draws for num in draw['numbers']}
+        supers = [(draw.get('super'), draw.get('date', '')) for draw in draws]
+        self.super_freq.update(num for num, _ in supers if num is not None)
+        self.super_last_seen = {num: date for num, date in supers if num is not None}
+
+    def _rebuild_counts(self, draws):
+        rows = [sorted(draw['numbers']) for draw in draws]
+
+        self.number_freq.update(chain.from_iterable(rows))
+        self.sum_freq.update(map(sum, rows))
+        self._grow(max(chain.from_iterable(rows), default=0))
+        for row in rows:
+            self.pair_counts[np.ix_(row, row)] += 1
+        self._add_triples(Counter(chain.from_iterable(combinations(row, 3) for row in rows)).items())
+        for row in rows:
+            for pos, num in enumerate(row[:5]):
+                self.position_freq[pos][num] += 1
+
+        mid = len(rows) // 2
+        self.first_half_freq.update(chain.from_iterable(rows[:mid]))
+        self.second_half_freq.update(chain.from_iterable(rows[mid:]))
+
+    def _rebuild_counts_vectorized(self, draws):
+        numbers = np.array([draw['numbers'] for draw in draws], dtype=np.uint8).reshape(len(draws), 5)
+        matrix = vectorized.DrawMatrix(numbers, None, None)
+        max_num = max(self.max_num, int(numbers.max(initial=0)))
+
+        self.number_freq.update(_counts(numbers.ravel()))
+        self.sum_freq.update(_counts(numbers.sum(axis=1, dtype=np.int64)))
+
+        self.pair_counts = vectorized.pair_matrix(matrix, max_num)
+
+        # Each sorted draw holds ten triples, counted as a * size^2 + b * size + c
+        size = max_num + 1
+        ordered = matrix.sorted_numbers().astype(np.int64)
+        keys = np.concatenate([(ordered[:, i] * size + ordered[:, j]) * size + ordered[:, k]
+                               for i, j, k in combinations(range(5), 3)])
+        present, counts = np.unique(keys, return_counts=True)
+        a, rest = np.divmod(present, size * size)
+        b, c = np.divmod(rest, size)
+        self._add_triples(zip(zip(a.tolist(), b.tolist(), c.tolist()), counts.tolist()))
+
+        for pos, column in enumerate(matrix.sorted_numbers().T):
+            self.position_freq[pos].update(_counts(column))
+
+        mid = len(draws) // 2
+        self.first_half_freq.update(_counts(numbers[:mid].ravel()))
+        self.second_half_freq.update(_counts(numbers[mid:].ravel()))
+
+    def _grow(self, top):
+        """
+        Enlarges pair_counts so it can index numbers up to `top`.
+        """
+        if top >= len(self.pair_counts):
+            grown = np.zeros((top + 1, top + 1), dtype=np.int64)
+            grown[:len(self.pair_counts), :len(self.pair_counts)] = self.pair_counts
+            self.pair_counts = grown
+
+    def _add_triples(self, triples):
+        """
+        Adds ((a, b, c), count) items of sorted triples.
+        """
+        for (a, b, c), count in triples:
+            self.triple_freq[a][(b, c)] += count
+            self.triple_freq[b][(a, c)] += count
+            self.triple_freq[c][(a, b)] += count
+
+    def _rebalance_halves(self, draw, idx):
+        """
+        Keeps the first half counters equal to the first len // 2 draws.
+        At most one draw crosses the boundary per insertion.
+        """
+        draws = self.partition.draws
+        old_mid = (len(draws) - 1) // 2
+        new_mid = len(draws) // 2
+
+        if idx < old_mid:
+            self.first_half_freq.update(draw['numbers'])
+            if new_mid == old_mid:
+                # The last draw of the first half moves to the second half
+                moved = draws[old_mid]['numbers']
+                self.first_half_freq.subtract(moved)
+                self.second_half_freq.update(moved)
+        else:
+            self.second_half_freq.update(draw['numbers'])
+            if new_mid > old_mid:
+                # The first draw of the second half moves to the first half
+                moved = draws[old_mid]['numbers']
+                self.second_half_freq.subtract(moved)
+                self.first_half_freq.update(moved)
+
+    def draws_since(self, date):
+        """
+        Number of draws strictly newer than `date`.
+        """
+        dates = self.partition.dates
+        return len(dates) - bisect.bisect_right(dates, date)
+
+    # ============================================
+    # VIEWS (same shapes as the logic.py functions)
+    # ============================================
+
+    @timed('analytics.frequencies')
+    def frequencies(self):
+        return {'numbers': dict(self.number_freq), 'super': dict(self.super_freq)}
+
+    @timed('analytics.hot_cold')
+    def hot_cold(self):
+        if not len(self):
+            return {'hot': [], 'cold': [], 'neutral': []}
+        return logic.classify_hot_cold(self.number_freq, len(self), self.max_num)
+
+    @timed('analytics.gaps')
+    def gaps(self):
+        if not len(self):
+            return []
+
+        result = []
+        for num in range(1, self.max_num + 1):
+            date = self.last_seen.get(num)
+            if date is None:
+                result.append({'number': num, 'gap': len(self), 'last_seen': None})
+            else:
+                result.append({'number': num, 'gap': self.draws_since(date), 'last_seen': date})
+
+        result.sort(key=lambda x: x['gap'], reverse=True)
+        return result
+
+    @timed('analytics.pairs')
+    def pairs(self, k=20):
+        if not len(self):
+            return []
+        # Row-major order of the upper triangle is pair order, so a stable sort
+        # breaks ties by pair and the result does not depend on insertion order
+        a, b = np.triu_indices(len(self.pair_counts), 1)
+        counts = self.pair_counts[a, b]
+        top = np.argsort(-counts, kind='stable')[:k]
+        return [{'pair': [int(a[i]), int(b[i])], 'frequency': int(counts[i])} for i in top if counts[i] > 0]
+
+    def pair_frequency(self, a, b):
+        """
+        Draws containing both a and b (the frequency of a when a == b).
+        """
+        if not (0 < a < len(self.pair_counts) and 0 < b < len(self.pair_counts)):
+            return 0
+        return int(self.pair_counts[a, b])
+
+    def triple_frequency(self, a, b, c):
+        a, b, c = sorted((a, b, c))
+        return self.triple_freq[a][(b, c)] if a in self.triple_freq else 0
+
+    def conditional_probability(self, number, given):
+        """
+        P(number is drawn | every number in `given` is drawn), from the pair
+        (one given number) or triple (two given numbers) counts.
+        """
+        given = sorted(set(given) - {number})
+        if len(given) == 1:
+            seen, both = self.pair_frequency(given[0], given[0]), self.pair_frequency(given[0], number)
+        elif len(given) == 2:
+            seen, both = self.pair_frequency(*given), self.triple_frequency(number, *given)
+        else:
+            raise ValueError('Condition on one or two numbers')
+        return both / seen if seen else 0.0
+
+    @timed('analytics.companions')
+    def companions(self, number, k=10):
+        """
+        The k numbers most often drawn together with `number`, with
+        P(companion | number), and the k most frequent triples containing it.
+        """
+        if not 0 < number <= self.max_num:
+            raise ValueError(f'Number must be between 1 and {self.max_num}')
+
+        seen = self.pair_frequency(number, number)
+        row = self.pair_counts[number, :self.max_num + 1].copy()
+        row[[0, number]] = 0
+        top = np.argsort(-row, kind='stable')[:k]
+        companions = [{'number': int(other), 'frequency': int(row[other]),
+                       'probability': round(int(row[other]) / seen, 4) if seen else 0.0}
+                      for other in top if row[other] > 0]
+
+        top_triples = heapq.nsmallest(k, self.triple_freq.get(number, {}).items(),
+                                      key=lambda item: (-item[1], item[0]))
+        triples = [{'triple': sorted((number, *others)), 'frequency': freq,
+                    'probability': round(freq / seen, 4) if seen else 0.0}
+                   for others, freq in top_triples if freq > 0]
+
+        return {'number': number, 'frequency': seen, 'total_draws': len(self),
+                'companions': companions, 'triples': triples}
+
+    @timed('analytics.sum_distribution')
+    def sum_distribution(self):
+        return logic.summarize_sum_counts(self.sum_freq)
+
+    @timed('analytics.trends')
+    def trends(self):
+        if len(self) < 5:
+            return {'trending_up': [], 'trending_down': [], 'stable': []}
+        mid = len(self) // 2
+        return logic.classify_trends(self.first_half_freq, self.second_half_freq,
+                                     mid, len(self) - mid, self.max_num)
+
+    @timed('analytics.positions')
+    def positions(self):
+        if not len(self):
+            return []
+        return logic.summarize_positions([_by_key(counter) for counter in self.position_freq])
+
+    @timed('analytics.super_analysis')
+    def super_analysis(self):
+        if not len(self):
+            return {'frequencies': [], 'hot': [], 'cold': [], 'gaps': []}
+        last_seen = {num: self.draws_since(date) for num, date in self.super_last_seen.items()}
+        return logic.summarize_super(_by_key(self.super_freq), last_seen, len(self))
+
+    @timed('analytics.comprehensive')
+    def comprehensive(self):
+        """
+        Same payload as logic.get_comprehensive_prediction_data.
+        """
+        return {
+            'frequency_chart': self.frequencies(),
+            'hot_cold': self.hot_cold(),
+            'gaps': self.gaps(),
+            'pairs': self.pairs(),
+            'sum_distribution': self.sum_distribution(),
+            'trends': self.trends(),
+            'position_analysis': self.positions(),
+            'super_analysis': self.super_analysis() if self.game_type == 'baloto' else None,
+            'total_draws': len(self)
+        }
+
+
+def _counts(values):
+    """
+    {value: occurrences} for a non-negative integer array.
+    """
+    counts = np.bincount(values)
+    present = np.flatnonzero(counts)
+    return dict(zip(present.tolist(), counts[present].tolist()))
+
+
+def _by_key(counter):
+    """
+    Copy of a Counter with keys in ascending order, so most_common breaks
+    ties by value instead of by insertion order.
+    """
+    return Counter({key: count for key, count in sorted(counter.items()) if count > 0})
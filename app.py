@@ -1,13 +1,119 @@
-from flask import Flask, render_template, jsonify, request
-import scraper
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context, g
 import logic
-from datetime import datetime
+import backfill
+import backtest
+import combinatorics
+import events
+import metrics
+import randomness
+import refresh
+import rolling
+import strategies
+import vectorized
+from timeseries import FrequencySeries
+from store import DrawStore, validate_draw
+from persistence import DrawDatabase
+from cache import AnalyticsCache
+from datetime import date as Date, datetime
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
 
 app = Flask(__name__)
 
-# In-memory storage for results (in a real app, use a DB)
+# Add a Server-Timing header to every response (or per request with ?server_timing=1)
+app.config['SERVER_TIMING'] = os.environ.get('SW_BALOTO_SERVER_TIMING') == '1'
+
+# Upper bound for /api/generate/<game_type>?count=N
+MAX_BATCH_TICKETS = 100000
+
+# Default and largest number of points of /api/predictive/<game_type>/time-series
+TIME_SERIES_POINTS = 200
+MAX_TIME_SERIES_POINTS = 5000
+
+# Upper bound on tickets simulated by one /api/predictive/<game_type>/backtest
+MAX_BACKTEST_TICKETS = 5000000
+
+# Largest page served by /api/history/<game_type>?limit=N
+MAX_HISTORY_PAGE = 1000
+HISTORY_FIELDS = ('date', 'type', 'numbers', 'super')
+
+# Results partitioned by game type and sorted by date
 # Structure: {'date': 'YYYY-MM-DD', 'type': 'baloto'|'miloto', 'numbers': [1,2,3,4,5], 'super': 6 (optional)}
-stored_results = []
+# Every added draw is written through to the on-disk history, reloaded at startup.
+# Readers work on immutable per-game snapshots (store.partition), so routes are
+# safe under a multi-threaded server; writes are serialized by the store
+# Backtest pool workers (backtest.shared_pool) are spawned, so they re-import
+# the main module (app.py or launcher.py); they only score tickets and skip
+# opening and loading the history
+store = DrawStore(db=DrawDatabase() if multiprocessing.current_process().name == 'MainProcess' else None)
+store.load()
+
+# Store changes are pushed to /api/events subscribers
+event_broker = events.EventBroker()
+store.add_listener(events.StorePublisher(event_broker).on_change)
+
+# Refresh jobs run in the background; scheduled after every draw once started
+refresh_worker = refresh.RefreshWorker(store)
+
+# Archive crawls run in the background too, one at a time
+backfill_worker = backfill.BackfillWorker(store)
+
+# Computed analytics keyed by (game_type, analysis, dataset version)
+analytics_cache = AnalyticsCache(maxsize=128)
+
+@metrics.registry.register_collector
+def collect_app_metrics():
+    cache_stats = analytics_cache.stats()
+    games = store.game_types()
+    return [
+        ('sw_baloto_cache_hits_total', 'counter', 'Analytics cache hits.', [({}, cache_stats['hits'])]),
+        ('sw_baloto_cache_misses_total', 'counter', 'Analytics cache misses.', [({}, cache_stats['misses'])]),
+        ('sw_baloto_cache_hit_ratio', 'gauge', 'Analytics cache hit ratio.', [({}, cache_stats['hit_rate'])]),
+        ('sw_baloto_cache_entries', 'gauge', 'Entries in the analytics cache.', [({}, cache_stats['size'])]),
+        ('sw_baloto_dataset_draws', 'gauge', 'Stored draws per game.',
+         [({'game': game}, store.count(game)) for game in games]),
+        ('sw_baloto_dataset_version', 'gauge', 'Dataset version per game.',
+         [({'game': game}, store.version(game)) for game in games]),
+        ('sw_baloto_event_subscribers', 'gauge', 'Connected /api/events clients.', [({}, len(event_broker))]),
+    ]
+
+@app.before_request
+def sync_store():
+    # Under a multi-process server every worker holds its own store over the
+    # shared database; pick up draws the other workers committed
+    store.sync()
+
+@app.before_request
+def start_request_metrics():
+    g.request_start = time.perf_counter()
+    g.timing_token = metrics.start_request_timings()
+
+@app.after_request
+def record_request_metrics(response):
+    token = g.pop('timing_token', None)
+    if token is None:
+        return response
+    
+    elapsed = time.perf_counter() - g.request_start
+    timings = metrics.finish_request_timings(token)
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.registry.observe(metrics.REQUEST_METRIC, elapsed, route=route, method=request.method,
+                             status=response.status_code)
+    
+    if app.config['SERVER_TIMING'] or request.args.get('server_timing') == '1':
+        response.headers['Server-Timing'] = metrics.server_timing_header(timings, elapsed)
+    return response
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Prometheus text exposition of latency histograms, cache and dataset stats.
+    """
+    return Response(metrics.registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/')
 def index():
@@ -15,65 +121,200 @@ def index():
 
 @app.route('/api/fetch-results', methods=['POST'])
 def fetch_results():
-    global stored_results
+    """
+    Queues a refresh of the latest results and returns its job immediately.
+    Clicks while a refresh is queued or running get that same job.
+    """
+    job = refresh_worker.request()
+    return jsonify({'status': 'accepted', 'job_id': job['id'], 'job': job}), 202
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """
+    Recent refresh and backfill jobs (newest first) and the next scheduled refresh.
+    """
+    next_scheduled = refresh_worker.next_scheduled
+    jobs = sorted(refresh_worker.jobs() + backfill_worker.jobs(), key=lambda job: job['created_at'], reverse=True)
+    return jsonify({
+        'status': 'success',
+        'jobs': jobs,
+        'next_scheduled': next_scheduled.isoformat(timespec='seconds') if next_scheduled else None
+    })
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = refresh_worker.get(job_id) or backfill_worker.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+    return jsonify({'status': 'success', 'job': job})
+
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """
+    Server-sent events: 'draws' with the new draws of a game and 'analytics'
+    with the changed frequency, hot/cold and gap entries. A 'reset' event
+    asks the client to reload, after it missed more events than are kept.
+    """
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    subscription = event_broker.subscribe(last_event_id)
+    
+    def generate():
+        try:
+            yield 'retry: 5000\n\n'
+            yield from subscription.stream()
+        finally:
+            event_broker.unsubscribe(subscription)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/backfill', methods=['POST'])
+def run_backfill():
+    """
+    Starts a crawl of the full result archives in the background and returns
+    its job immediately (poll /api/jobs/<job_id>). Requests made while a
+    crawl is running get that same job.
+    Optional JSON body: {'games': ['baloto', 'miloto'], 'max_pages': int}
+    """
+    data = request.get_json(silent=True) or {}
+    games = data.get('games', ['baloto', 'miloto'])
+    if any(game not in backfill.ARCHIVES for game in games):
+        return jsonify({'status': 'error', 'message': 'Invalid game type'}), 400
     try:
-        # Fetch fresh data
-        baloto_data = scraper.get_baloto_results()
-        miloto_data = scraper.get_miloto_results()
-        
-        # Merge with existing (avoiding duplicates based on date+type would be better, but simple append for now)
-        # Simplified: Just replace or extend. Let's extend and deduplicate in logic if needed.
-        # For this version, we'll assume we fetch the "latest" set.
-        
-        new_results = baloto_data + miloto_data
-        stored_results.extend([r for r in new_results if r not in stored_results])
-        
-        return jsonify({'status': 'success', 'message': f'Fetched {len(new_results)} new results.', 'count': len(stored_results)})
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+        max_pages = int(data.get('max_pages', backfill.MAX_PAGES))
+    except (TypeError, ValueError):
+        max_pages = 0
+    if max_pages < 1:
+        return jsonify({'status': 'error', 'message': 'max_pages must be a positive integer'}), 400
+    
+    job = backfill_worker.request(games, max_pages)
+    return jsonify({'status': 'accepted', 'job_id': job['id'], 'job': job}), 202
 
-@app.route('/api/generate-miloto', methods=['GET'])
-def generate_miloto():
-    # Filter for MiLoto
-    miloto_history = [r for r in stored_results if r['type'] == 'miloto']
-    if not miloto_history:
+def int_arg(name, default=None):
+    """
+    Integer query parameter, or `default` when it is absent. Raises
+    ValueError when it is present but malformed, where
+    request.args.get(type=int) would silently fall back to the default.
+    """
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an integer') from None
+
+def strategy_tables(partition, name):
+    """
+    Returns (strategy, sampling tables) for a game snapshot; the tables are
+    built once per dataset version and kept in the analytics cache.
+    Raises ValueError for unknown strategies.
+    """
+    strategy = strategies.get_strategy(name)
+    tables = analytics_cache.get_or_compute(
+        (partition.game_type, f'strategy@{name}', partition.version),
+        lambda: strategy.tables(strategies.StrategyState.from_analytics(partition.analytics)))
+    return strategy, tables
+
+def generate_single(game_type):
+    partition = store.partition(game_type)
+    if not len(partition):
         return jsonify({'status': 'error', 'message': 'No data found. Fetch info first.'}), 400
     
-    prediction = logic.generate_miloto_prediction(miloto_history)
-    return jsonify({'status': 'success', 'prediction': prediction})
+    try:
+        strategy, tables = strategy_tables(partition, request.args.get('strategy', strategies.DEFAULT_STRATEGY))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    
+    prediction = next(strategies.iter_tickets(strategy, tables, np.random.default_rng(), 1, game_type == 'baloto'))
+    return jsonify({'status': 'success', 'prediction': prediction, 'strategy': strategy.name})
+
+@app.route('/api/generate-miloto', methods=['GET'])
+def generate_miloto():
+    return generate_single('miloto')
 
 @app.route('/api/generate-baloto', methods=['GET'])
 def generate_baloto():
-    # Filter for Baloto
-    baloto_history = [r for r in stored_results if r['type'] == 'baloto']
-    if not baloto_history:
+    return generate_single('baloto')
+
+@app.route('/api/strategies', methods=['GET'])
+def list_strategies():
+    return jsonify({
+        'status': 'success',
+        'default': strategies.DEFAULT_STRATEGY,
+        'strategies': [{'name': s.name, 'description': s.description} for s in strategies.STRATEGIES.values()]
+    })
+
+@app.route('/api/generate/<game_type>', methods=['GET'])
+def generate_batch(game_type):
+    """
+    Generates `count` tickets from a single set of strategy tables.
+    Query params: count (default 1), seed (optional, reproducible batches),
+    strategy (see /api/strategies), stream=1 to receive NDJSON lines as
+    tickets are produced.
+    """
+    if game_type not in ['baloto', 'miloto']:
+        return jsonify({'status': 'error', 'message': 'Invalid game type'}), 400
+    
+    try:
+        count = int_arg('count', 1)
+        seed = int_arg('seed')
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    stream = request.args.get('stream', '0') in ('1', 'true')
+    
+    if not 1 <= count <= MAX_BATCH_TICKETS:
+        return jsonify({'status': 'error', 'message': f'count must be between 1 and {MAX_BATCH_TICKETS}'}), 400
+    partition = store.partition(game_type)
+    if not len(partition):
         return jsonify({'status': 'error', 'message': 'No data found. Fetch info first.'}), 400
     
-    prediction = logic.generate_baloto_prediction(baloto_history)
-    return jsonify({'status': 'success', 'prediction': prediction})
+    try:
+        strategy, tables = strategy_tables(partition, request.args.get('strategy', strategies.DEFAULT_STRATEGY))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    
+    rng = np.random.default_rng(seed)
+    predictions = strategies.iter_tickets(strategy, tables, rng, count, game_type == 'baloto')
+    
+    if stream:
+        lines = (json.dumps(prediction) + '\n' for prediction in predictions)
+        return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+    
+    return jsonify({'status': 'success', 'predictions': list(predictions), 'count': count, 'seed': seed,
+                    'strategy': strategy.name})
 
 @app.route('/api/add-manual', methods=['POST'])
 def add_manual():
-    data = request.json
-    # Expect: {date, type, numbers (list), super (optional)}
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'status': 'error', 'message': 'Expected a JSON object'}), 400
+    
+    # Expect: {date, type, numbers (list), super_balota (optional)}
+    new_entry = {
+        'date': data.get('date') or datetime.now().strftime('%Y-%m-%d'),
+        'type': data.get('type'),
+        'numbers': data.get('numbers'),
+    }
+    super_num = data.get('super_balota', data.get('super'))
+    if super_num is not None:
+        new_entry['super'] = super_num
+    
     try:
-        new_entry = {
-            'date': data.get('date', datetime.now().strftime('%Y-%m-%d')),
-            'type': data['type'],
-            'numbers': data['numbers'],
-            'super': data.get('super_balota')
-        }
-        stored_results.append(new_entry)
-        return jsonify({'status': 'success', 'message': 'Entry added manually.'})
-    except Exception as e:
+        validate_draw(new_entry)
+    except ValueError as e:
         return jsonify({'status': 'error', 'message': str(e)}), 400
+    
+    if not store.add(new_entry):
+        return jsonify({'status': 'success', 'message': 'Entry already stored.'})
+    return jsonify({'status': 'success', 'message': 'Entry added manually.'})
 
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     # Return raw stats for frontend visualization
     return jsonify({
-        'baloto': logic.calculate_frequencies([r for r in stored_results if r['type'] == 'baloto']),
-        'miloto': logic.calculate_frequencies([r for r in stored_results if r['type'] == 'miloto'])
+        'baloto': store.analytics('baloto').frequencies(),
+        'miloto': store.analytics('miloto').frequencies()
     })
 
 
@@ -81,6 +322,47 @@ def get_stats():
 # PREDICTIVE ANALYTICS ENDPOINTS
 # ============================================
 
+def cached_analysis(partition, analysis, compute):
+    """
+    Serves an analysis of a game snapshot (store.partition) from the cache,
+    keyed on its dataset version; `compute` must read that same snapshot.
+    Answers 304 when the client already holds the current version (ETag).
+    With ?window=N|Nd (and optionally step=N|Nd) the analysis is returned as
+    a series over sliding windows instead (see rolling.py).
+    """
+    game_type = partition.game_type
+    if 'window' in request.args and analysis in rolling.ANALYSIS_VIEWS:
+        try:
+            window = rolling.parse_span(request.args['window'])
+            step = rolling.parse_span(request.args['step']) if 'step' in request.args else None
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        
+        name = analysis
+        analysis = f"{name}@{request.args['window']}/{request.args.get('step', '')}"
+        compute = lambda: rolling.rolling_analysis(partition, name, window, step)
+    
+    version = partition.version
+    # The checksum is the same in every worker process holding the same draws
+    etag = f'{game_type}-{analysis}-{partition.checksum:x}'
+    
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    
+    try:
+        data = analytics_cache.get_or_compute((game_type, analysis, version), compute)
+    except ValueError as e:
+        # Only a rolling series is expected to fail (too many points)
+        if 'window' not in request.args:
+            raise
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    response = jsonify({'status': 'success', 'data': data})
+    response.set_etag(etag)
+    return response
+
+
 @app.route('/api/predictive/<game_type>', methods=['GET'])
 def get_predictive_data(game_type):
     """
@@ -89,16 +371,14 @@ def get_predictive_data(game_type):
     if game_type not in ['baloto', 'miloto']:
         return jsonify({'status': 'error', 'message': 'Invalid game type'}), 400
     
-    history = [r for r in stored_results if r['type'] == game_type]
-    
-    if not history:
+    partition = store.partition(game_type)
+    if not len(partition):
         return jsonify({
             'status': 'error',
             'message': f'No data found for {game_type}. Please fetch data first.'
         }), 400
     
-    data = logic.get_comprehensive_prediction_data(history, game_type)
-    return jsonify({'status': 'success', 'data': data})
+    return cached_analysis(partition, 'comprehensive', partition.analytics.comprehensive)
 
 
 @app.route('/api/predictive/<game_type>/hot-cold', methods=['GET'])
@@ -109,13 +389,11 @@ def get_hot_cold(game_type):
     if game_type not in ['baloto', 'miloto']:
         return jsonify({'status': 'error', 'message': 'Invalid game type'}), 400
     
-    history = [r for r in stored_results if r['type'] == game_type]
-    
-    if not history:
+    partition = store.partition(game_type)
+    if not len(partition):
         return jsonify({'status': 'error', 'message': 'No data found'}), 400
     
-    data = logic.calculate_hot_cold_numbers(history, game_type)
-    return jsonify({'status': 'success', 'data': data})
+    return cached_analysis(partition, 'hot-cold', partition.analytics.hot_cold)
 
 
 @app.route('/api/predictive/<game_type>/gaps', methods=['GET'])
@@ -126,13 +404,11 @@ def get_gaps(game_type):
     if game_type not in ['baloto', 'miloto']:
         return jsonify({'status': 'error', 'message': 'Invalid game type'}), 400
     
-    history = [r for r in stored_results if r['type'] == game_type]
-    
-    if not history:
+    partition = store.partition(game_type)
+    if not len(partition):
         return jsonify({'status': 'error', 'message': 'No data found'}), 400
     
-    data = logic.calculate_number_gaps(history, game_type)
-    return jsonify({'status': 'success', 'data': data})
+    return cached_analysis(partition, 'gaps', partition.analytics.gaps)
 
 
 @app.route('/api/predictive/<game_type>/trends', methods=['GET'])
@@ -143,30 +419,58 @@ def get_trends(game_type):
     if game_type not in ['baloto', 'miloto']:
         return jsonify({'status': 'error', 'message': 'Invalid game type'}), 400
     
-    history = [r for r in stored_results if r['type'] == game_type]
-    
-    if not history:
+    partition = store.partition(game_type)
+    if not len(partition):
         return jsonify({'status': 'error', 'message': 'No data found'}), 400
     
-    data = logic.calculate_trend_analysis(history, game_type)
-    return jsonify({'status': 'success', 'data': data})
+    return cached_analysis(partition, 'trends', partition.analytics.trends)
 
 
 @app.route('/api/predictive/<game_type>/pairs', methods=['GET'])
 def get_pairs(game_type):
     """
     Returns pair frequency analysis.
+    Query params: k (pairs returned, default 20); number=X returns the k
+    numbers and triples most often drawn with X instead, and given=Y[,Z]
+    adds P(X | Y[, Z]).
     """
     if game_type not in ['baloto', 'miloto']:
         return jsonify({'status': 'error', 'message': 'Invalid game type'}), 400
     
-    history = [r for r in stored_results if r['type'] == game_type]
-    
-    if not history:
+    partition = store.partition(game_type)
+    if not len(partition):
         return jsonify({'status': 'error', 'message': 'No data found'}), 400
     
-    data = logic.calculate_pair_frequency(history, game_type)
-    return jsonify({'status': 'success', 'data': data})
+    analytics = partition.analytics
+    if 'window' in request.args or not {'number', 'k', 'given'} & request.args.keys():
+        return cached_analysis(partition, 'pairs', analytics.pairs)
+    
+    try:
+        k = int(request.args.get('k', 20))
+        number = int(request.args['number']) if 'number' in request.args else None
+        given = [int(x) for x in request.args['given'].split(',')] if 'given' in request.args else None
+        if k < 1:
+            raise ValueError('k must be positive')
+        if given is not None and number is None:
+            raise ValueError('given requires number')
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    
+    if number is None:
+        return cached_analysis(partition, f'pairs@{k}', lambda: analytics.pairs(k))
+    
+    def compute():
+        data = analytics.companions(number, k)
+        if given is not None:
+            data['given'] = given
+            data['probability'] = round(analytics.conditional_probability(number, given), 4)
+        return data
+    
+    key = f"pairs@{k}/{number}/{request.args.get('given', '')}"
+    try:
+        return cached_analysis(partition, key, compute)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
 
 
 @app.route('/api/predictive/<game_type>/sum-distribution', methods=['GET'])
@@ -177,13 +481,45 @@ def get_sum_distribution(game_type):
     if game_type not in ['baloto', 'miloto']:
         return jsonify({'status': 'error', 'message': 'Invalid game type'}), 400
     
-    history = [r for r in stored_results if r['type'] == game_type]
+    partition = store.partition(game_type)
+    if not len(partition):
+        return jsonify({'status': 'error', 'message': 'No data found'}), 400
+    
+    return cached_analysis(partition, 'sum-distribution', partition.analytics.sum_distribution)
+
+
+@app.route('/api/predictive/<game_type>/theoretical', methods=['GET'])
+def get_theoretical(game_type):
+    """
+    Observed distribution of each draw statistic (sum, odd, low, consecutive)
+    next to its exact probability under fair draws (see combinatorics.py).
+    """
+    if game_type not in ['baloto', 'miloto']:
+        return jsonify({'status': 'error', 'message': 'Invalid game type'}), 400
+    
+    partition = store.partition(game_type)
+    if not len(partition):
+        return jsonify({'status': 'error', 'message': 'No data found'}), 400
+    
+    return cached_analysis(partition, 'theoretical', lambda: combinatorics.compare(partition.draws, game_type))
+
+
+@app.route('/api/predictive/<game_type>/randomness', methods=['GET'])
+def get_randomness(game_type):
+    """
+    Randomness tests of the stored draws (see randomness.py): chi-square
+    uniformity, per-number frequency, runs, serial correlation and gap
+    tests with p-values.
+    """
+    if game_type not in ['baloto', 'miloto']:
+        return jsonify({'status': 'error', 'message': 'Invalid game type'}), 400
     
-    if not history:
+    partition = store.partition(game_type)
+    if not len(partition):
         return jsonify({'status': 'error', 'message': 'No data found'}), 400
     
-    data = logic.calculate_sum_distribution(history, game_type)
-    return jsonify({'status': 'success', 'data': data})
+    return cached_analysis(partition, 'randomness',
+                           lambda: randomness.run_tests(vectorized.DrawMatrix.from_history(partition.draws), game_type))
 
 
 @app.route('/api/predictive/<game_type>/positions', methods=['GET'])
@@ -194,32 +530,157 @@ def get_positions(game_type):
     if game_type not in ['baloto', 'miloto']:
         return jsonify({'status': 'error', 'message': 'Invalid game type'}), 400
     
-    history = [r for r in stored_results if r['type'] == game_type]
+    partition = store.partition(game_type)
+    if not len(partition):
+        return jsonify({'status': 'error', 'message': 'No data found'}), 400
     
-    if not history:
+    return cached_analysis(partition, 'positions', partition.analytics.positions)
+
+
+@app.route('/api/predictive/<game_type>/time-series', methods=['GET'])
+def get_time_series(game_type):
+    """
+    Cumulative frequency of every number over time, one row per draw.
+    Query params: points (default TIME_SERIES_POINTS) downsamples evenly over
+    the draws; date=YYYY-MM-DD returns only the frequencies as of that date.
+    """
+    if game_type not in ['baloto', 'miloto']:
+        return jsonify({'status': 'error', 'message': 'Invalid game type'}), 400
+    
+    partition = store.partition(game_type)
+    if not len(partition):
         return jsonify({'status': 'error', 'message': 'No data found'}), 400
     
-    data = logic.calculate_position_analysis(history, game_type)
-    return jsonify({'status': 'success', 'data': data})
+    try:
+        points = int_arg('points', TIME_SERIES_POINTS)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    # The first and the last draw are always sampled
+    if not 2 <= points <= MAX_TIME_SERIES_POINTS:
+        return jsonify({'status': 'error', 'message': f'points must be between 2 and {MAX_TIME_SERIES_POINTS}'}), 400
+    
+    date = request.args.get('date')
+    if date:
+        try:
+            # Normalized, so every spelling of a date shares one cache entry
+            date = Date.fromisoformat(date).isoformat()
+        except ValueError:
+            return jsonify({'status': 'error', 'message': 'date must be YYYY-MM-DD'}), 400
+    
+    # The compact series itself is cached per dataset version and shared by every query
+    max_num = partition.analytics.max_num
+    series = analytics_cache.get_or_compute((game_type, 'frequency-series', partition.version),
+                                            lambda: FrequencySeries.from_draws(partition.draws, max_num))
+    
+    if date:
+        def compute():
+            index = series.index_at(date)
+            counts = series.counts_at(index)
+            return {
+                'date': date,
+                'last_draw': series.dates[index] if index >= 0 else None,
+                'total_draws': index + 1,
+                'frequencies': {num: int(counts[num]) for num in range(1, max_num + 1)}
+            }
+        return cached_analysis(partition, f'time-series@{date}', compute)
+    
+    return cached_analysis(partition, f'time-series@{points}', lambda: series.to_dict(series.sample_indices(points)))
 
+@app.route('/api/predictive/<game_type>/backtest', methods=['GET'])
+def get_backtest(game_type):
+    """
+    Replays the stored history and scores each strategy's tickets against
+    every draw. Query params: tickets (per strategy and draw, default 100),
+    strategies (comma-separated), warmup, seed. Results are deterministic
+    for a given seed, so they are cached with the dataset version.
+    """
+    if game_type not in ['baloto', 'miloto']:
+        return jsonify({'status': 'error', 'message': 'Invalid game type'}), 400
+    
+    partition = store.partition(game_type)
+    draws = partition.draws
+    if not draws:
+        return jsonify({'status': 'error', 'message': 'No data found'}), 400
+    
+    try:
+        tickets = int_arg('tickets', 100)
+        warmup = int_arg('warmup', backtest.DEFAULT_WARMUP)
+        seed = int_arg('seed', 0)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    strategy_names = request.args.get('strategies', ','.join(backtest.STRATEGIES)).split(',')
+    
+    if any(name not in backtest.STRATEGIES for name in strategy_names):
+        return jsonify({'status': 'error', 'message': f'strategies must be among {", ".join(backtest.STRATEGIES)}'}), 400
+    if tickets < 1 or warmup < 0:
+        return jsonify({'status': 'error', 'message': 'tickets must be positive and warmup not negative'}), 400
+    if tickets * len(strategy_names) * max(0, len(draws) - warmup) > MAX_BACKTEST_TICKETS:
+        return jsonify({'status': 'error', 'message': f'At most {MAX_BACKTEST_TICKETS} tickets per backtest'}), 400
+    
+    key = f"backtest@{','.join(strategy_names)}/{tickets}/{warmup}/{seed}"
+    return cached_analysis(partition, key,
+                           lambda: backtest.run_backtest(draws, game_type, strategy_names, tickets, warmup, seed,
+                                                         executor=backtest.shared_pool()))
 
 @app.route('/api/history/<game_type>', methods=['GET'])
 def get_history(game_type):
     """
-    Returns historical draw data for a game type.
+    Returns historical draw data for a game type, newest first.
+    Query params (all optional; without them every draw is returned):
+    from/to ('YYYY-MM-DD', inclusive), limit (at most MAX_HISTORY_PAGE),
+    offset, or cursor (next_cursor of the previous page),
+    fields (comma-separated subset of HISTORY_FIELDS),
+    format=compact to get rows as arrays in the order of 'fields'.
     """
     if game_type not in ['baloto', 'miloto']:
         return jsonify({'status': 'error', 'message': 'Invalid game type'}), 400
     
-    history = [r for r in stored_results if r['type'] == game_type]
-    sorted_history = sorted(history, key=lambda x: x.get('date', ''), reverse=True)
+    # Malformed values must not fall back to the whole history
+    try:
+        limit = int_arg('limit')
+        offset = int_arg('offset', 0)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    if limit is not None and not 1 <= limit <= MAX_HISTORY_PAGE:
+        return jsonify({'status': 'error', 'message': f'limit must be an integer between 1 and {MAX_HISTORY_PAGE}'}), 400
+    if offset < 0:
+        return jsonify({'status': 'error', 'message': 'offset must be a non-negative integer'}), 400
     
-    return jsonify({
-        'status': 'success',
-        'data': sorted_history,
-        'count': len(sorted_history)
-    })
+    bounds = {}
+    for name in ('from', 'to'):
+        if request.args.get(name):
+            try:
+                bounds[name] = Date.fromisoformat(request.args[name]).isoformat()
+            except ValueError:
+                return jsonify({'status': 'error', 'message': f'{name} must be YYYY-MM-DD'}), 400
+    
+    fields = request.args.get('fields')
+    fields = fields.split(',') if fields else list(HISTORY_FIELDS)
+    if any(field not in HISTORY_FIELDS for field in fields):
+        return jsonify({'status': 'error', 'message': f'fields must be among {", ".join(HISTORY_FIELDS)}'}), 400
+    
+    try:
+        page = store.history_page(game_type, bounds.get('from'), bounds.get('to'),
+                                  offset, limit, request.args.get('cursor'))
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid cursor'}), 400
+    
+    draws = page['draws']
+    if request.args.get('format') == 'compact':
+        data = [[draw.get(field) for field in fields] for draw in draws]
+    elif 'fields' in request.args:
+        data = [{field: draw[field] for field in fields if field in draw} for draw in draws]
+    else:
+        data = draws
+    
+    response = {'status': 'success', 'data': data, 'count': len(data)}
+    if request.args:
+        response.update({'total': page['total'], 'next_cursor': page['next_cursor'], 'fields': fields})
+    return jsonify(response)
 
 
 if __name__ == '__main__':
+    # With the debug reloader, only the serving child process runs the worker
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        refresh_worker.start()
     app.run(debug=True, port=5000, host='127.0.0.2')
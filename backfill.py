@@ -0,0 +1,212 @@
+"""
+Historical backfill for SW BALOTO.
+Walks the paginated result archives (newest page first) with bounded
+parallelism and stores every draw found. Progress is checkpointed per game,
+so an interrupted crawl resumes where it stopped. Once an archive has been
+crawled completely, later runs are incremental: they stop at the first page
+that brings no new draws. A first crawl stops when a page repeats the
+previous one or only holds draws already seen in this crawl (the archive
+ignoring the page parameter). Crawls run as background jobs (BackfillWorker).
+"""
+from collections import OrderedDict
+from datetime import datetime
+import threading
+import uuid
+
+import scraper
+from refresh import DRAW_TIMEZONE
+
+# Archive URL template and page parser per game
+ARCHIVES = {
+    'baloto': (scraper.BALOTO_HISTORY_URL, scraper.parse_baloto_results),
+    'miloto': (scraper.MILOTO_HISTORY_URL, scraper.parse_miloto_results),
+}
+
+# Safety bound on the number of archive pages walked per game
+MAX_PAGES = 1000
+
+# Pages downloaded at once; the scraper also limits requests per host
+PARALLEL_PAGES = 4
+
+# Finished jobs kept for /api/jobs/<id>
+MAX_JOBS = 20
+
+
+class _MemoryCheckpoints:
+    """
+    Checkpoint storage used when the store has no database.
+    """
+
+    def __init__(self):
+        self._state = {}
+
+    def get_checkpoint(self, game_type):
+        return dict(self._state.get(game_type, {'next_page': 1, 'complete': False}))
+
+    def save_checkpoint(self, game_type, next_page, complete):
+        self._state[game_type] = {'next_page': next_page, 'complete': complete}
+
+
+_memory_checkpoints = _MemoryCheckpoints()
+
+
+def backfill(store, games=('baloto', 'miloto'), max_pages=MAX_PAGES, parallel_pages=PARALLEL_PAGES):
+    """
+    Backfills each game's archive into the store.
+    Returns {game: {'added': int, 'pages': int, 'complete': bool, 'stopped': str|None, 'error': str|None}}.
+    """
+    return {game: backfill_game(store, game, max_pages, parallel_pages) for game in games}
+
+
+def backfill_game(store, game_type, max_pages=MAX_PAGES, parallel_pages=PARALLEL_PAGES):
+    url_template, parse = ARCHIVES[game_type]
+    checkpoints = store.db if store.db is not None else _memory_checkpoints
+    state = checkpoints.get_checkpoint(game_type)
+
+    # A finished archive is refreshed from page 1 until known draws are reached
+    incremental = state['complete']
+    page = 1 if incremental else state['next_page']
+    complete = state['complete']
+    summary = {'added': 0, 'pages': 0, 'complete': complete, 'stopped': None, 'error': None}
+    previous_html = None
+    seen = set()  # Draws parsed during this crawl
+
+    while page <= max_pages:
+        batch = list(range(page, min(page + parallel_pages, max_pages + 1)))
+        urls = [url_template.format(page=p) for p in batch]
+        pages = scraper.fetch_pages(urls, max_workers=parallel_pages)
+
+        for p, url in zip(batch, urls):
+            html = pages[url]
+            if isinstance(html, Exception):
+                summary['error'] = f'Page {p}: {html}'
+                return summary
+
+            draws = parse(html, recent_only=False)
+            summary['pages'] += 1
+
+            if not draws:
+                # Past the last archive page
+                complete = True
+                checkpoints.save_checkpoint(game_type, p, complete)
+                summary['complete'] = complete
+                return summary
+
+            keys = {(d['type'], d.get('date', ''), tuple(sorted(d['numbers']))) for d in draws}
+            if not incremental and (html == previous_html or keys <= seen):
+                # The archive served a page already walked: treat it as the end
+                complete = True
+                checkpoints.save_checkpoint(game_type, p, complete)
+                summary['complete'] = complete
+                summary['stopped'] = f'Page {p} repeats earlier pages'
+                return summary
+            previous_html = html
+            seen |= keys
+
+            added = store.extend(draws)
+            summary['added'] += len(added)
+            checkpoints.save_checkpoint(game_type, 1 if incremental else p + 1, complete)
+
+            if incremental and not added:
+                # Reached draws that were already stored
+                return summary
+
+        page = batch[-1] + 1
+
+    return summary
+
+
+class BackfillWorker:
+    """
+    Runs backfill crawls as background jobs, one at a time. A request made
+    while a crawl is running gets that job back.
+    Job structure: {'id': str, 'status': 'queued'|'running'|'done'|'error',
+    'trigger': 'backfill', 'games': [...], 'max_pages': int, 'created_at',
+    'started_at', 'finished_at', 'summary': dict|None, 'added': int,
+    'count': int, 'message': str, 'error': str|None}
+    """
+
+    def __init__(self, store, clock=None, max_jobs=MAX_JOBS):
+        self.store = store
+        self.clock = clock or (lambda: datetime.now(DRAW_TIMEZONE))
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._current = None
+        self._lock = threading.Lock()
+
+    def request(self, games, max_pages=MAX_PAGES):
+        """
+        Starts a crawl of the given games unless one is running.
+        Returns a copy of the job.
+        """
+        with self._lock:
+            job = self._current
+            if job is None:
+                job = self._current = self._new_job(games, max_pages)
+                threading.Thread(target=self._execute, args=(job,), name='backfill-worker', daemon=True).start()
+            return dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def jobs(self):
+        """
+        Returns copies of the known jobs, newest first.
+        """
+        with self._lock:
+            return [dict(job) for job in reversed(self._jobs.values())]
+
+    def _new_job(self, games, max_pages):
+        job = {
+            'id': uuid.uuid4().hex,
+            'status': 'queued',
+            'trigger': 'backfill',
+            'games': list(games),
+            'max_pages': max_pages,
+            'created_at': self._now(),
+            'started_at': None,
+            'finished_at': None,
+            'summary': None,
+            'added': 0,
+            'count': None,
+            'message': None,
+            'error': None,
+        }
+        self._jobs[job['id']] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+        return job
+
+    def _execute(self, job):
+        with self._lock:
+            job['status'] = 'running'
+            job['started_at'] = self._now()
+
+        summary, added = None, 0
+        try:
+            summary = backfill(self.store, job['games'], max_pages=job['max_pages'])
+            added = sum(result['added'] for result in summary.values())
+            errors = [f"{game}: {result['error']}" for game, result in summary.items() if result['error']]
+            if errors:
+                status, message, error = 'error', '; '.join(errors), '; '.join(errors)
+            else:
+                status, message, error = 'done', f'Backfilled {added} results.', None
+        except Exception as e:
+            status, message, error = 'error', str(e), str(e)
+
+        with self._lock:
+            job.update({
+                'status': status,
+                'finished_at': self._now(),
+                'summary': summary,
+                'added': added,
+                'count': len(self.store),
+                'message': message,
+                'error': error,
+            })
+            self._current = None
+
+    def _now(self):
+        return self.clock().isoformat(timespec='seconds')
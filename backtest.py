@@ -0,0 +1,279 @@
+"""
+Monte Carlo backtesting of the prediction strategies.
+Replays a game's history in date order: for every draw, each strategy of
+strategies.py builds its tables from the draws of earlier dates only,
+generates M tickets and the tickets are scored against the actual draw.
+Tickets are sampled and scored with NumPy (numbers as 64-bit masks, matches
+as popcounts) and the replay is split in fixed chunks of draws run on a
+process pool. Every chunk has its own seed derived from (seed, strategy,
+chunk), so results do not depend on the number of workers.
+
+Usage:
+    python backtest.py --game baloto --tickets 1000 --workers 4
+    python backtest.py --game miloto --simulate 5000 --seed 7
+"""
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import argparse
+import bisect
+import json
+import multiprocessing
+import os
+import threading
+import time
+import zlib
+
+import numpy as np
+
+import vectorized
+from strategies import STRATEGIES, StrategyState, sample_one
+
+# Ball pools per game; Baloto and Revancha add a Super Balota from 1 to 16
+POOL_SIZES = {'baloto': 43, 'revancha': 43, 'miloto': 39}
+SUPER_POOL = 16
+
+# (tier, numbers matched, super balota matched); None ignores the super balota
+PRIZE_TIERS = {
+    'baloto': [('5+SB', 5, True), ('5', 5, False), ('4+SB', 4, True), ('4', 4, False), ('3+SB', 3, True),
+               ('3', 3, False), ('2+SB', 2, True), ('1+SB', 1, True), ('0+SB', 0, True)],
+    'miloto': [('5', 5, None), ('4', 4, None), ('3', 3, None), ('2', 2, None)],
+}
+PRIZE_TIERS['revancha'] = PRIZE_TIERS['baloto']
+
+# Draws skipped at the start so strategies have some history to learn from
+DEFAULT_WARMUP = 50
+
+# Draws per task; fixed so that seeding does not depend on the pool size
+CHUNK_DRAWS = 64
+
+
+# ============================================
+# SCORING
+# ============================================
+
+# BITS[n] has only bit n set; numbers go up to 43, so masks fit in 64 bits
+BITS = np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))
+
+
+def to_masks(numbers):
+    """
+    Bitmask (bit n set for number n) of each row of an array of distinct numbers.
+    """
+    return BITS[numbers].sum(axis=1, dtype=np.uint64)
+
+
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount(masks):
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(masks)
+    return _BYTE_POPCOUNT[masks.view(np.uint8).reshape(len(masks), 8)].sum(axis=1)
+
+
+# ============================================
+# REPLAY
+# ============================================
+
+# Set in each worker by _init_worker: numbers, supers, prior, after, pool, tickets
+_replay = {}
+_REPLAY_KEYS = ('numbers', 'supers', 'prior', 'after', 'pool', 'tickets')
+
+
+def _init_worker(*args):
+    _replay.update(zip(_REPLAY_KEYS, args))
+
+
+def _run_chunk(task, replay=None):
+    """
+    Replays draws [start, stop) for one strategy. Returns a (6, 2) array of
+    ticket counts by (numbers matched, super balota matched).
+    """
+    name, start, stop, seed = task
+    replay = replay or _replay
+    numbers, supers, prior, after = replay['numbers'], replay['supers'], replay['prior'], replay['after']
+    pool, tickets = replay['pool'], replay['tickets']
+    strategy = STRATEGIES[name]
+    rng = np.random.default_rng(seed)
+    has_super = supers is not None
+
+    # Accumulators over every draw dated before the first draw of the chunk
+    cursor = prior[start]
+    seen = numbers[:cursor]
+    number_counts = np.bincount(seen.ravel(), minlength=pool + 1)[1:pool + 1].astype(np.float64)
+    last_index = np.full(pool + 1, -1, dtype=np.int64)
+    np.maximum.at(last_index, seen.ravel(), np.arange(cursor).repeat(5))
+    super_counts = np.zeros(SUPER_POOL)
+    super_last = np.full(SUPER_POOL + 1, -1, dtype=np.int64)
+    if has_super:
+        super_counts += np.bincount(supers[:cursor], minlength=SUPER_POOL + 1)[1:SUPER_POOL + 1]
+        np.maximum.at(super_last, supers[:cursor], np.arange(cursor))
+    pair_counts = None
+    if strategy.uses_pairs:
+        matrix = vectorized.DrawMatrix(seen, None, None)
+        pair_counts = vectorized.pair_matrix(matrix, pool)[1:, 1:].astype(np.float64)
+
+    def gaps(last):
+        # Draws dated after the last appearance, as GameAnalytics counts them
+        return np.where(last >= 0, cursor - after[np.maximum(last, 0)], cursor).astype(np.float64)
+
+    table = np.zeros(12, dtype=np.int64)
+    draw_masks = to_masks(numbers[start:stop])
+    tables = None
+    for t in range(start, stop):
+        while cursor < prior[t]:
+            drawn = numbers[cursor]
+            number_counts[drawn - 1] += 1
+            last_index[drawn] = cursor
+            if pair_counts is not None:
+                pair_counts[np.ix_(drawn - 1, drawn - 1)] += 1
+            if has_super and supers[cursor]:
+                super_counts[supers[cursor] - 1] += 1
+                super_last[supers[cursor]] = cursor
+            cursor += 1
+            tables = None
+
+        if tables is None:
+            state = StrategyState(pool, cursor, number_counts, super_counts, gaps(last_index[1:]),
+                                  gaps(super_last[1:]), pair_counts)
+            tables = strategy.tables(state)
+
+        picks = strategy.sample(tables, rng, tickets) + 1
+        matches = popcount(to_masks(picks) & draw_masks[t - start]).astype(np.int64)
+
+        super_hit = np.zeros(tickets, dtype=np.int64)
+        if has_super:
+            super_picks = sample_one(rng, tables['super'], tickets) + 1
+            super_hit = (super_picks == supers[t]).astype(np.int64)
+
+        table += np.bincount(matches * 2 + super_hit, minlength=12)
+
+    return table.reshape(6, 2)
+
+
+def _chunk_seed(seed, strategy, start):
+    return np.random.SeedSequence([seed, zlib.crc32(strategy.encode()), start])
+
+
+def _summarize(game_type, table, draws_tested, tickets):
+    total = int(table.sum())
+    histogram = table.sum(axis=1)
+    tiers = {}
+    for name, matched, super_matched in PRIZE_TIERS[game_type]:
+        count = table[matched].sum() if super_matched is None else table[matched, int(super_matched)]
+        tiers[name] = int(count)
+
+    return {
+        'tickets': total,
+        'match_histogram': histogram.tolist(),
+        'super_hits': int(table[:, 1].sum()),
+        'mean_matches': round(float((histogram * np.arange(6)).sum() / max(1, total)), 5),
+        'prize_tiers': tiers,
+        'prize_rate': round(sum(tiers.values()) / max(1, total), 6),
+        'draws_tested': draws_tested,
+        'tickets_per_draw': tickets,
+    }
+
+
+# Process pool shared by the backtests of a long-running server, see shared_pool
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def shared_pool():
+    """
+    One process pool for the whole process, started on first use. Workers
+    are spawned rather than forked, so they do not inherit the threads and
+    locks of a running server (refresh worker, SSE streams, DB lock).
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
+        return _shared_pool
+
+
+def run_backtest(draws, game_type, strategies=tuple(STRATEGIES), tickets=100, warmup=DEFAULT_WARMUP,
+                 seed=0, workers=None, executor=None):
+    """
+    Backtests strategies over date-sorted draws of a single game.
+    workers: process count (None = all cores, 1 = run in this process).
+    executor: an existing process pool (e.g. shared_pool()) to run on instead
+    of starting one; the replay arrays are then sent along with the tasks.
+    Returns {'game', 'seed', 'expected_mean_matches', 'strategies': {name: summary}, ...}.
+    """
+    unknown = [name for name in strategies if name not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"Unknown strategy: {', '.join(unknown)}")
+
+    pool = POOL_SIZES[game_type]
+    dates = [draw.get('date', '') for draw in draws]
+    numbers = np.array([draw['numbers'] for draw in draws], dtype=np.uint8).reshape(len(draws), 5)
+    supers = None
+    if game_type in ('baloto', 'revancha'):
+        supers = np.array([draw.get('super') or 0 for draw in draws], dtype=np.uint8)
+    # Draws dated strictly before each draw (the only data a strategy may use),
+    # and draws dated up to it (to count gaps by date)
+    prior = np.array([bisect.bisect_left(dates, date) for date in dates], dtype=np.int64)
+    after = np.array([bisect.bisect_right(dates, date) for date in dates], dtype=np.int64)
+
+    tasks = [(name, start, min(start + CHUNK_DRAWS, len(draws)), _chunk_seed(seed, name, start))
+             for name in strategies for start in range(min(warmup, len(draws)), len(draws), CHUNK_DRAWS)]
+
+    started = time.perf_counter()
+    init_args = (numbers, supers, prior, after, pool, tickets)
+    replay = dict(zip(_REPLAY_KEYS, init_args))
+    if workers == 1 or len(tasks) <= 1:
+        tables = [_run_chunk(task, replay) for task in tasks]
+    elif executor is not None:
+        # Tasks are sent in a few large chunks, so the arrays are pickled a few times only
+        chunksize = max(1, len(tasks) // (4 * (os.cpu_count() or 1)))
+        tables = list(executor.map(partial(_run_chunk, replay=replay), tasks, chunksize=chunksize))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as executor:
+            tables = list(executor.map(_run_chunk, tasks))
+
+    totals = {name: np.zeros((6, 2), dtype=np.int64) for name in strategies}
+    for task, table in zip(tasks, tables):
+        totals[task[0]] += table
+
+    draws_tested = max(0, len(draws) - warmup)
+    return {
+        'game': game_type,
+        'seed': seed,
+        'warmup': warmup,
+        # Hypergeometric mean of a uniformly random ticket: 5 * 5 / pool
+        'expected_mean_matches': round(25 / pool, 5),
+        'strategies': {name: _summarize(game_type, totals[name], draws_tested, tickets) for name in strategies},
+        'elapsed_seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+if __name__ == '__main__':
+    import scraper
+    from persistence import DrawDatabase
+
+    parser = argparse.ArgumentParser(description='Backtest the prediction strategies on stored history')
+    parser.add_argument('--game', choices=sorted(POOL_SIZES), default='baloto')
+    parser.add_argument('--strategies', nargs='+', choices=sorted(STRATEGIES), default=list(STRATEGIES))
+    parser.add_argument('--tickets', type=int, default=100, help='Tickets per strategy and draw')
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--db', help='History database (default: the app database)')
+    parser.add_argument('--simulate', type=int, metavar='N', help='Use N simulated draws instead of stored history')
+    args = parser.parse_args()
+
+    if args.simulate:
+        if args.game == 'miloto':
+            history = scraper.generate_simulated_miloto_results(args.simulate)
+        else:
+            history = [d for d in scraper.generate_simulated_baloto_results(args.simulate) if d['type'] == args.game]
+        history.sort(key=lambda d: d['date'])
+    else:
+        db = DrawDatabase(args.db)
+        history = db.load(args.game)
+        db.close()
+
+    report = run_backtest(history, args.game, args.strategies, args.tickets, args.warmup, args.seed, args.workers)
+    print(json.dumps(report, indent=2))
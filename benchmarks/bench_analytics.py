@@ -0,0 +1,228 @@
+"""
+Scaling benchmark for the logic.py analytics and the app.py endpoints.
+Builds synthetic histories with the scraper's simulators and times, and
+memory-profiles, every calculate_* function (pure Python and vectorized),
+ticket generation and every /api/predictive route through the Flask test
+client. Results are written as JSON so runs on different commits can be
+compared offline.
+
+Usage:
+    python benchmarks/bench_analytics.py --sizes 1000 10000 100000 --output run.json
+    python benchmarks/bench_analytics.py --sizes 1000000 --skip-memory --workers 8
+    python benchmarks/bench_analytics.py --compare base.json run.json
+"""
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+# Keep the app from opening the on-disk history
+os.environ.setdefault('SW_BALOTO_DB', ':memory:')
+
+import logic  # noqa: E402
+import parallel  # noqa: E402
+import scraper  # noqa: E402
+import vectorized  # noqa: E402
+import app as app_module  # noqa: E402
+from store import DrawStore  # noqa: E402
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+GAMES = ['baloto', 'miloto']
+TICKETS = 1000
+
+# (name, function taking (history, game_type))
+PURE_FUNCTIONS = [
+    ('calculate_frequencies', lambda h, g: logic.calculate_frequencies(h)),
+    ('calculate_hot_cold_numbers', logic.calculate_hot_cold_numbers),
+    ('calculate_number_gaps', logic.calculate_number_gaps),
+    ('calculate_pair_frequency', logic.calculate_pair_frequency),
+    ('calculate_sum_distribution', logic.calculate_sum_distribution),
+    ('calculate_trend_analysis', logic.calculate_trend_analysis),
+    ('calculate_position_analysis', logic.calculate_position_analysis),
+    ('get_super_balota_analysis', lambda h, g: logic.get_super_balota_analysis(h)),
+    ('get_time_series_data', logic.get_time_series_data),
+    ('get_comprehensive_prediction_data', logic.get_comprehensive_prediction_data),
+]
+
+# (name, function taking (matrix, game_type))
+VECTORIZED_FUNCTIONS = [
+    ('calculate_frequencies', lambda m, g: vectorized.calculate_frequencies(m)),
+    ('calculate_hot_cold_numbers', vectorized.calculate_hot_cold_numbers),
+    ('calculate_number_gaps', vectorized.calculate_number_gaps),
+    ('calculate_pair_frequency', vectorized.calculate_pair_frequency),
+    ('calculate_sum_distribution', vectorized.calculate_sum_distribution),
+    ('calculate_trend_analysis', vectorized.calculate_trend_analysis),
+    ('calculate_position_analysis', vectorized.calculate_position_analysis),
+    ('get_super_balota_analysis', lambda m, g: vectorized.get_super_balota_analysis(m)),
+    ('get_comprehensive_prediction_data', vectorized.get_comprehensive_prediction_data),
+]
+
+ROUTES = ['', '/hot-cold', '/gaps', '/trends', '/pairs', '/sum-distribution', '/positions']
+
+
+def synthetic_history(game_type, size, seed):
+    rng = random.Random(seed)
+    if game_type == 'baloto':
+        return scraper.generate_simulated_baloto_results(size, include_revancha=False, rng=rng)
+    return scraper.generate_simulated_miloto_results(size, rng=rng)
+
+
+def measure(func, repeat, memory):
+    """
+    Best wall time over `repeat` runs, plus the tracemalloc peak of one more
+    run when memory is True.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    peak_kib = None
+    if memory:
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_kib = round(peak / 1024, 1)
+    return round(best, 6), peak_kib
+
+
+def bench_game(game_type, size, args, records):
+    history = synthetic_history(game_type, size, args.seed)
+
+    def record(group, name, func, repeat=args.repeat):
+        seconds, peak_kib = measure(func, repeat, not args.skip_memory)
+        records.append({'group': group, 'name': name, 'game': game_type, 'size': size,
+                        'seconds': seconds, 'peak_kib': peak_kib})
+        print(f"{group:<12}{name:<52}{game_type:<8}{size:>9}{seconds * 1000:>12.2f} ms"
+              + (f"{peak_kib:>12.0f} KiB" if peak_kib is not None else ''))
+
+    for name, func in PURE_FUNCTIONS:
+        if game_type == 'miloto' and name == 'get_super_balota_analysis':
+            continue
+        record('logic', name, lambda: func(history, game_type))
+
+    record('vectorized', 'DrawMatrix.from_history', lambda: vectorized.DrawMatrix.from_history(history))
+    matrix = vectorized.DrawMatrix.from_history(history)
+    for name, func in VECTORIZED_FUNCTIONS:
+        if game_type == 'miloto' and name == 'get_super_balota_analysis':
+            continue
+        record('vectorized', name, lambda: func(matrix, game_type))
+
+    if args.workers:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            record('parallel', f'get_comprehensive_prediction_data x{args.workers}',
+                   lambda: parallel.get_comprehensive_prediction_data(matrix, game_type, executor))
+
+    freqs = logic.calculate_frequencies(history)
+    iter_predictions = logic.iter_baloto_predictions if game_type == 'baloto' else logic.iter_miloto_predictions
+    record('generation', f'{TICKETS} tickets', lambda: list(iter_predictions(freqs, TICKETS, random.Random(args.seed))))
+
+    # Routes: load the history into a fresh store behind the app
+    store = DrawStore()
+    record('store', 'bulk load', lambda: DrawStore().extend(history), repeat=1)
+    store.extend(history)
+    app_module.store = store
+    client = app_module.app.test_client()
+
+    for route in ROUTES:
+        url = f'/api/predictive/{game_type}{route}'
+
+        def cold():
+            app_module.analytics_cache.clear()
+            client.get(url)
+
+        record('route', f'GET {url} (cold)', cold)
+        record('route', f'GET {url} (cached)', lambda: client.get(url))
+
+    record('route', f'GET /api/generate/{game_type}?count={TICKETS}',
+           lambda: client.get(f'/api/generate/{game_type}?count={TICKETS}&seed={args.seed}'))
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    records = []
+    print(f"{'group':<12}{'name':<52}{'game':<8}{'size':>9}{'time':>15}" + ('' if args.skip_memory else f"{'peak':>16}"))
+    for size in args.sizes:
+        for game_type in args.games:
+            bench_game(game_type, size, args, records)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+        },
+        'results': records,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {len(records)} results to {args.output}")
+    return report
+
+
+def compare(base_path, new_path, threshold):
+    """
+    Prints the time ratio new/base for every benchmark present in both runs
+    and flags the ones slower than `threshold`.
+    """
+    with open(base_path, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)
+
+    def key(r):
+        return (r['group'], r['name'], r['game'], r['size'])
+
+    base_times = {key(r): r['seconds'] for r in base['results']}
+    regressions = 0
+    print(f"base {base['meta'].get('commit')} -> new {new['meta'].get('commit')}")
+    for r in new['results']:
+        if key(r) not in base_times or not base_times[key(r)]:
+            continue
+        ratio = r['seconds'] / base_times[key(r)]
+        flag = '  REGRESSION' if ratio > threshold else ''
+        regressions += bool(flag)
+        print(f"{r['group']:<12}{r['name']:<52}{r['game']:<8}{r['size']:>9}{ratio:>8.2f}x{flag}")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Scaling benchmark for SW BALOTO analytics and endpoints')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--games', nargs='+', choices=GAMES, default=GAMES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=2026)
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Process pool size for the parallel bundle (0 to skip it)')
+    parser.add_argument('--skip-memory', action='store_true', help='Skip the tracemalloc pass (faster for 1M draws)')
+    parser.add_argument('--output', help='Write machine-readable results to this JSON file')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help='Compare two result files')
+    parser.add_argument('--threshold', type=float, default=1.2, help='Slowdown ratio reported as a regression')
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+    run(args)
@@ -0,0 +1,99 @@
+"""
+Parse-time and memory benchmark for the scraper on saved result pages.
+Compares the previous pipeline (full html.parser tree, two scans, regexes
+compiled in the loop) against the current one in scraper.py.
+Peak memory is measured with tracemalloc, which only sees Python
+allocations; the C-level tree built by lxml is not included.
+
+Usage: python benchmarks/bench_scraper.py [--repeat N] [page.html ...]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import scraper  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+DEFAULT_PAGES = {
+    'baloto_resultados.html': scraper.parse_baloto_results,
+    'miloto_resultados.html': scraper.parse_miloto_results,
+}
+
+
+def legacy_parse(html, min_cells):
+    """
+    The parsing work done before: a full html.parser tree, a scan over every
+    <tr> and a second scan over every result <div>/<section>.
+    """
+    results = []
+    soup = BeautifulSoup(html, 'html.parser')
+    for row in soup.find_all('tr'):
+        cells = row.find_all('td')
+        if len(cells) >= min_cells:
+            date_str = scraper.parse_spanish_date(cells[min_cells - 2].get_text(strip=True))
+            numbers = [int(n) for n in re.findall(r'\d+', cells[min_cells - 1].get_text(strip=True))]
+            if len(numbers) >= 5:
+                results.append((date_str, sorted(numbers[:5])))
+    for div in soup.find_all(['div', 'section'], class_=re.compile(r'result|histor', re.I)):
+        text = div.get_text()
+        date_matches = re.findall(r'\d{1,2}\s+de\s+\w+\s+de\s+\d{4}', text, re.I)
+        number_matches = re.findall(r'(\d{2}\s*-\s*\d{2}\s*-\s*\d{2}\s*-\s*\d{2}\s*-\s*\d{2})', text)
+        for date_match, num_match in zip(date_matches, number_matches):
+            results.append((scraper.parse_spanish_date(date_match), num_match))
+    return results
+
+
+def measure(func, repeat):
+    """
+    Returns (best wall time in ms, peak traced memory in KiB, result).
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak / 1024, result
+
+
+def run(pages, repeat):
+    print(f"HTML parser: {'lxml' if scraper.lxml_html is not None else 'html.parser + SoupStrainer'}")
+    print(f"{'page':<28}{'pipeline':<10}{'time ms':>10}{'peak KiB':>12}{'results':>9}")
+    for path, parse in pages.items():
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        min_cells = 3 if parse is scraper.parse_baloto_results else 2
+
+        rows = [
+            ('legacy',) + measure(lambda: legacy_parse(html, min_cells), repeat),
+            ('current',) + measure(lambda: parse(html, recent_only=False), repeat),
+        ]
+        for name, ms, kib, result in rows:
+            print(f"{os.path.basename(path):<28}{name:<10}{ms:>10.1f}{kib:>12.0f}{len(result):>9}")
+        print(f"{'':<28}{'speedup':<10}{rows[0][1] / rows[1][1]:>9.1f}x{rows[0][2] / rows[1][2]:>11.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('pages', nargs='*', help='Saved result pages (default: benchmarks/fixtures)')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.pages:
+        # Pages with 'miloto' in their name are parsed as MiLoto, the rest as Baloto
+        pages = {p: scraper.parse_miloto_results if 'miloto' in os.path.basename(p).lower()
+                 else scraper.parse_baloto_results for p in args.pages}
+    else:
+        pages = {os.path.join(FIXTURES_DIR, name): parse for name, parse in DEFAULT_PAGES.items()}
+
+    run(pages, args.repeat)
@@ -1,7 +1,14 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+import sys
+
 block_cipher = None
 
+# Exact draw-statistic distributions, computed here once and shipped in the bundle
+sys.path.insert(0, SPECPATH)
+import combinatorics
+combinatorics.write_cache()
+
 a = Analysis(
     ['launcher.py'],
     pathex=[],
@@ -9,17 +16,21 @@ a = Analysis(
     datas=[
         ('templates', 'templates'),
         ('static', 'static'),
+        (combinatorics.CACHE_FILENAME, '.'),
     ],
     hiddenimports=[
         'flask',
         'requests',
         'beautifulsoup4',
         'bs4',
+        'lxml',
+        'lxml.html',
         'werkzeug',
         'jinja2',
         'click',
         'itsdangerous',
         'markupsafe',
+        'numpy',
     ],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,75 @@
+"""
+LRU cache for computed analytics.
+Entries are keyed by (game_type, analysis, dataset version); a new draw bumps
+the version of its game, so stale entries are never hit and age out.
+Misses are single-flight: concurrent requests for a key being computed wait
+for that computation instead of running their own.
+"""
+from collections import OrderedDict
+from concurrent.futures import Future
+import threading
+
+
+class AnalyticsCache:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._pending = {}  # key -> Future of the computation in progress
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached value for key, calling compute() on a miss.
+        Callers arriving while another one computes the same key wait for
+        its result (or its exception) and count as hits.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            pending = self._pending.get(key)
+            if pending is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                future = self._pending[key] = Future()
+
+        if pending is not None:
+            return pending.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._pending[key]
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        future.set_result(value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            'size': len(self._entries),
+            'maxsize': self.maxsize
+        }
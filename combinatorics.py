@@ -0,0 +1,225 @@
+"""
+Exact distributions of draw statistics under fair draws.
+Every 5-number ticket of a game is equally likely, so the probability of a
+statistic value is the number of combinations having it over C(pool, 5).
+Those counts come from dynamic programming over the numbers 1..pool (one
+step per number, picked or not) instead of enumerating the 962,598
+Baloto / 575,757 MiLoto combinations. The results are written to a JSON
+cache at build time (see build_exe.spec) and loaded once per process.
+
+Statistics of a ticket:
+    sum          total of its five numbers
+    odd          how many of them are odd
+    low          how many are in the lower half of the pool (<= pool // 2)
+    consecutive  how many pairs of consecutive numbers it holds (n, n + 1)
+
+Usage:
+    python combinatorics.py    # writes the cache next to this file
+"""
+from collections import Counter
+import json
+import math
+import os
+import sys
+
+from analytics import MAX_NUMBERS
+
+PICKS = 5
+
+STATISTICS = ('sum', 'odd', 'low', 'consecutive')
+
+CACHE_FILENAME = 'combinatorics_cache.json'
+
+# Bumped whenever the cached layout or the statistics change
+CACHE_VERSION = 1
+
+
+# ============================================
+# EXACT COUNTS
+# ============================================
+
+def sum_counts(pool, picks=PICKS):
+    """
+    {sum: combinations of `picks` numbers from 1..pool adding up to it}.
+    ways[k][s] counts the k-subsets of the numbers seen so far with sum s.
+    """
+    max_sum = sum(range(pool - picks + 1, pool + 1))
+    ways = [[0] * (max_sum + 1) for _ in range(picks + 1)]
+    ways[0][0] = 1
+    for num in range(1, pool + 1):
+        # Larger k first so each number is picked at most once
+        for k in range(min(num, picks), 0, -1):
+            below, row = ways[k - 1], ways[k]
+            for s in range(max_sum, num - 1, -1):
+                if below[s - num]:
+                    row[s] += below[s - num]
+    return {s: count for s, count in enumerate(ways[picks]) if count}
+
+
+def split_counts(pool, members, picks=PICKS):
+    """
+    {k: combinations with exactly k of their numbers among `members` numbers}.
+    """
+    counts = {k: math.comb(members, k) * math.comb(pool - members, picks - k) for k in range(picks + 1)}
+    return {k: count for k, count in counts.items() if count}
+
+
+def consecutive_counts(pool, picks=PICKS):
+    """
+    {c: combinations holding exactly c pairs of consecutive numbers}.
+    ways[taken][k][c] counts the k-subsets of the numbers seen so far with c
+    consecutive pairs, split by whether the last number seen was picked.
+    """
+    ways = [[[0] * picks for _ in range(picks + 1)] for _ in range(2)]
+    ways[0][0][0] = 1
+    for _ in range(pool):
+        step = [[[0] * picks for _ in range(picks + 1)] for _ in range(2)]
+        for taken in (0, 1):
+            for k in range(picks + 1):
+                for c in range(picks):
+                    count = ways[taken][k][c]
+                    if not count:
+                        continue
+                    step[0][k][c] += count
+                    if k < picks:
+                        step[1][k + 1][c + taken] += count
+        ways = step
+    totals = [ways[0][picks][c] + ways[1][picks][c] for c in range(picks)]
+    return {c: count for c, count in enumerate(totals) if count}
+
+
+def exact_distributions(pool, picks=PICKS):
+    """
+    Combination counts of every statistic for a pool of numbers:
+    {'pool', 'combinations', 'sum': {value: count}, 'odd': {...}, 'low': {...}, 'consecutive': {...}}.
+    """
+    return {
+        'pool': pool,
+        'combinations': math.comb(pool, picks),
+        'sum': sum_counts(pool, picks),
+        'odd': split_counts(pool, (pool + 1) // 2, picks),
+        'low': split_counts(pool, pool // 2, picks),
+        'consecutive': consecutive_counts(pool, picks),
+    }
+
+
+# ============================================
+# CACHE
+# ============================================
+
+def default_cache_path():
+    """
+    The cache ships inside the PyInstaller bundle; otherwise it lives next to this file.
+    """
+    base_dir = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_dir, CACHE_FILENAME)
+
+
+def write_cache(path=None):
+    """
+    Computes the distributions of every game and writes them as JSON.
+    """
+    games = {}
+    for game_type, pool in MAX_NUMBERS.items():
+        exact = exact_distributions(pool)
+        # JSON keys are strings; keep the values as [value, count] pairs instead
+        games[game_type] = {key: sorted(value.items()) if isinstance(value, dict) else value
+                            for key, value in exact.items()}
+
+    path = path or default_cache_path()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'picks': PICKS, 'games': games}, f)
+    return path
+
+
+def load_cache(path=None):
+    """
+    {game_type: distributions} from the cache file, or None if it is
+    missing, unreadable or from another CACHE_VERSION.
+    """
+    try:
+        with open(path or default_cache_path(), encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('version') != CACHE_VERSION or cached.get('picks') != PICKS:
+        return None
+    return {game_type: {key: {v: count for v, count in value} if isinstance(value, list) else value
+                        for key, value in exact.items()}
+            for game_type, exact in cached['games'].items()}
+
+
+# Distributions by game type, filled on first use
+_distributions = {}
+
+
+def distributions(game_type):
+    """
+    Exact distributions of a game: from memory, else the cache file, else computed.
+    """
+    if game_type not in _distributions:
+        cached = load_cache() or {}
+        for pool_game in MAX_NUMBERS:
+            _distributions.setdefault(pool_game, cached.get(pool_game) or exact_distributions(MAX_NUMBERS[pool_game]))
+    return _distributions[game_type]
+
+
+# ============================================
+# EMPIRICAL VS THEORETICAL
+# ============================================
+
+def draw_statistics(numbers, pool):
+    """
+    The statistics of one draw's numbers.
+    """
+    ordered = sorted(numbers)
+    return {
+        'sum': sum(ordered),
+        'odd': sum(1 for num in ordered if num % 2),
+        'low': sum(1 for num in ordered if num <= pool // 2),
+        'consecutive': sum(1 for a, b in zip(ordered, ordered[1:]) if b == a + 1),
+    }
+
+
+def compare(draws, game_type):
+    """
+    Observed vs exact distribution of every statistic over a game's draws.
+    Returns {'total_draws', 'combinations', 'statistics': {name: {'expected_mean',
+    'observed_mean', 'distribution': [{'value', 'observed', 'observed_share',
+    'probability', 'expected'}]}}}, with one row per value that is possible
+    or was observed.
+    """
+    exact = distributions(game_type)
+    pool, total = exact['pool'], exact['combinations']
+    n = len(draws)
+
+    observed = {name: Counter() for name in STATISTICS}
+    for draw in draws:
+        for name, value in draw_statistics(draw['numbers'], pool).items():
+            observed[name][value] += 1
+
+    statistics = {}
+    for name in STATISTICS:
+        counts = exact[name]
+        rows = []
+        for value in sorted(set(counts) | set(observed[name])):
+            probability = counts.get(value, 0) / total
+            seen = observed[name][value]
+            rows.append({
+                'value': value,
+                'observed': seen,
+                'observed_share': round(seen / n, 6) if n else 0,
+                'probability': round(probability, 8),
+                'expected': round(probability * n, 4),
+            })
+        statistics[name] = {
+            'expected_mean': round(sum(v * c for v, c in counts.items()) / total, 4),
+            'observed_mean': round(sum(v * c for v, c in observed[name].items()) / n, 4) if n else 0,
+            'distribution': rows,
+        }
+
+    return {'total_draws': n, 'combinations': total, 'statistics': statistics}
+
+
+if __name__ == '__main__':
+    print(f'Wrote {write_cache()}')
@@ -0,0 +1,193 @@
+"""
+Server-sent events for SW BALOTO.
+The store notifies StorePublisher whenever draws are added; it publishes the
+new draws and the changes to the frequency, hot/cold and gap tables through
+an EventBroker, which fans them out to every /api/events subscriber.
+"""
+from collections import deque
+import json
+import queue
+import threading
+
+# Events kept for clients reconnecting with Last-Event-ID
+BACKLOG_SIZE = 256
+
+# Events buffered per subscriber before it is dropped as too slow
+QUEUE_SIZE = 256
+
+# Seconds between keep-alive comments on an idle stream
+KEEPALIVE_SECONDS = 15
+
+# Larger batches (bulk loads, backfills) are announced without the draws
+MAX_EVENT_DRAWS = 500
+
+
+def format_event(event_id, event_type, data):
+    return f'id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
+
+
+class Subscription:
+    def __init__(self, queue_size=QUEUE_SIZE):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def push(self, text):
+        """
+        Queues an event. Returns False if the subscriber fell too far behind.
+        """
+        try:
+            self.queue.put_nowait(text)
+            return True
+        except queue.Full:
+            return False
+
+    def close(self):
+        self.closed = True
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def stream(self, keepalive=KEEPALIVE_SECONDS):
+        """
+        Yields formatted events until the subscription is closed, with a
+        keep-alive comment whenever the stream is idle for `keepalive` seconds.
+        """
+        while not self.closed:
+            try:
+                text = self.queue.get(timeout=keepalive)
+            except queue.Empty:
+                yield ': keepalive\n\n'
+                continue
+            if text is None:
+                return
+            yield text
+
+
+class EventBroker:
+    def __init__(self, backlog=BACKLOG_SIZE, queue_size=QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._backlog = deque(maxlen=backlog)
+        self._subscribers = set()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def publish(self, event_type, data):
+        """
+        Sends an event to every subscriber and returns its id.
+        Subscribers whose queue is full are closed; they reconnect and replay.
+        """
+        with self._lock:
+            event_id = self._next_id
+            self._next_id += 1
+            text = format_event(event_id, event_type, data)
+            self._backlog.append((event_id, text))
+            for subscription in list(self._subscribers):
+                if not subscription.push(text):
+                    self._subscribers.discard(subscription)
+                    subscription.close()
+        return event_id
+
+    def subscribe(self, last_event_id=None):
+        """
+        Registers a subscriber. With last_event_id, the events published since
+        then are queued first, or a 'reset' event if they are no longer kept.
+        """
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            if last_event_id is not None and last_event_id < self._next_id - 1:
+                missed = [text for event_id, text in self._backlog if event_id > last_event_id]
+                oldest = self._backlog[0][0] if self._backlog else self._next_id
+                if oldest > last_event_id + 1 or len(missed) >= self.queue_size:
+                    subscription.push(format_event(self._next_id - 1, 'reset', {}))
+                else:
+                    for text in missed:
+                        subscription.push(text)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+        subscription.close()
+
+
+def analytics_tables(analytics):
+    """
+    The tables pushed to clients, keyed by number for diffing.
+    """
+    return {
+        'numbers': dict(analytics.number_freq),
+        'super': dict(analytics.super_freq),
+        # All three lists, as /api/predictive returns them
+        'hot_cold': analytics.hot_cold(),
+        'gaps': {entry['number']: [entry['gap'], entry['last_seen']] for entry in analytics.gaps()},
+    }
+
+
+def _changed(old, new):
+    return {key: value for key, value in new.items() if old.get(key) != value}
+
+
+def analytics_delta(old, new):
+    """
+    Entries of `new` that differ from `old` (or all of `new` when old is None).
+    Values are absolute, so applying a delta twice is harmless.
+    """
+    if old is None:
+        return {
+            'full': True,
+            'frequency_chart': {'numbers': new['numbers'], 'super': new['super']},
+            'hot_cold': new['hot_cold'],
+            'gaps': new['gaps'],
+        }
+
+    delta = {
+        'full': False,
+        'frequency_chart': {
+            'numbers': _changed(old['numbers'], new['numbers']),
+            'super': _changed(old['super'], new['super']),
+        },
+        'gaps': _changed(old['gaps'], new['gaps']),
+    }
+    if old['hot_cold'] != new['hot_cold']:
+        delta['hot_cold'] = new['hot_cold']
+    return delta
+
+
+class StorePublisher:
+    """
+    Store listener publishing 'draws' and 'analytics' events for each game
+    that changed. The last tables sent per game are kept to compute deltas;
+    they are dropped while nobody is listening.
+    """
+
+    def __init__(self, broker):
+        self.broker = broker
+        self._tables = {}
+
+    def on_change(self, store, added):
+        if not len(self.broker):
+            self._tables.clear()
+            return
+
+        by_game = {}
+        for draw in added:
+            by_game.setdefault(draw['type'], []).append(draw)
+
+        for game_type, draws in by_game.items():
+            version = store.version(game_type)
+            payload = {'game': game_type, 'version': version, 'total_draws': store.count(game_type),
+                       'added': len(draws)}
+            if len(draws) <= MAX_EVENT_DRAWS:
+                payload['draws'] = sorted(draws, key=lambda d: d.get('date', ''), reverse=True)
+            self.broker.publish('draws', payload)
+
+            tables = analytics_tables(store.analytics(game_type))
+            delta = analytics_delta(self._tables.get(game_type), tables)
+            self._tables[game_type] = tables
+            delta.update({'game': game_type, 'version': version, 'total_draws': store.count(game_type)})
+            self.broker.publish('analytics', delta)
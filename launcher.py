@@ -2,10 +2,11 @@
 SW BALOTO Launcher
 Starts the Flask server and automatically opens the browser
 """
+import multiprocessing
 import webbrowser
 import threading
 import time
-from app import app
+from app import app, refresh_worker
 
 def open_browser():
     """Wait for server to start, then open browser"""
@@ -13,9 +14,15 @@ def open_browser():
     webbrowser.open('http://127.0.0.2:5000')
 
 if __name__ == '__main__':
+    # Backtests run on a process pool; needed for the frozen executable
+    multiprocessing.freeze_support()
+    
     # Start browser in a separate thread
     threading.Thread(target=open_browser, daemon=True).start()
     
+    # Refresh results after every draw while the app is open
+    refresh_worker.start()
+    
     # Start Flask server
     print("=" * 50)
     print("SW BALOTO - Analizador de Resultados de Lotería")
@@ -1,124 +1,357 @@
 import random
 from collections import Counter
 from datetime import datetime, timedelta
+from functools import cached_property
+from itertools import chain, combinations, islice, repeat, zip_longest
 import math
 
+from metrics import timed
+from timeseries import FrequencySeries
+
+@timed('calculate_frequencies')
 def calculate_frequencies(history):
     """
     Calculates the frequency of each number in the history.
     """
-    if not history:
-        return {'numbers': {}, 'super': {}}
-    
-    all_numbers = []
-    all_supers = []
-    
-    for draw in history:
-        all_numbers.extend(draw['numbers'])
-        if 'super' in draw and draw['super'] is not None:
-            all_supers.append(draw['super'])
-            
-    num_freq = dict(Counter(all_numbers))
-    super_freq = dict(Counter(all_supers))
-    
-    return {'numbers': num_freq, 'super': super_freq}
+    return HistoryStats(history).frequencies()
 
-def weighted_choice(frequencies, k, pool_range):
+class WeightedSampler:
     """
-    Selects k unique numbers from pool_range, weighted by their frequency.
-    If a number is not in frequencies, it gets a base weight (e.g., 1).
+    Weighted sampling without replacement over a fixed population.
+    Weights live in a Fenwick tree built once, so each pick costs O(log n).
+    Picked weights are restored after every sample, so one sampler can be
+    reused to draw any number of tickets from the same frequency table.
+    """
+
+    def __init__(self, population, weights):
+        self.population = list(population)
+        self.weights = list(weights)
+        self.total = sum(self.weights)
+        self._size = len(self.weights)
+        self._tree = [0] * (self._size + 1)
+        for i, weight in enumerate(self.weights, start=1):
+            self._tree[i] += weight
+            parent = i + (i & -i)
+            if parent <= self._size:
+                self._tree[parent] += self._tree[i]
+        self._top = 1 << (self._size.bit_length() - 1) if self._size else 0
+
+    def _update(self, idx, delta):
+        i = idx + 1
+        while i <= self._size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _find(self, value):
+        """
+        Returns the index of the item whose cumulative weight range contains value.
+        """
+        pos = 0
+        step = self._top
+        while step:
+            nxt = pos + step
+            if nxt <= self._size and self._tree[nxt] <= value:
+                pos = nxt
+                value -= self._tree[nxt]
+            step >>= 1
+        return pos
+
+    def sample(self, k, rng=random):
+        """
+        Picks k distinct items; each pick is proportional to the remaining weights.
+        """
+        picked = []
+        remaining = self.total
+        while len(picked) < k and remaining > 0:
+            idx = self._find(rng.random() * remaining)
+            picked.append(idx)
+            self._update(idx, -self.weights[idx])
+            remaining -= self.weights[idx]
+
+        for idx in picked:
+            self._update(idx, self.weights[idx])
+
+        return sorted(self.population[idx] for idx in picked)
+
+    def sample_batch(self, k, count, rng=random):
+        return [self.sample(k, rng) for _ in range(count)]
+
+
+def build_sampler(frequencies, pool_range):
+    """
+    Sampler over pool_range where each number weighs its frequency + 1.
     """
     population = list(pool_range)
     # Default weight 1, add frequency count to it
-    weights = [frequencies.get(num, 0) + 1 for num in population]
-    
-    # random.choices allows replacement, we need unique. 
-    # Logic: Pick one, remove from pool, re-normalize weights? 
-    # Simpler: Shuffle population based on weights? 
-    # Or just use numpy choice if available, but let's stick to pure python.
-    
-    selected = set()
-    while len(selected) < k:
-        # Normalize weights for current selection
-        current_pop = [x for x in population if x not in selected]
-        current_weights = [frequencies.get(num, 0) + 1 for x in current_pop for num in [x]] # inefficient but safe
-        
-        if not current_pop:
-            break
-            
-        pick = random.choices(current_pop, weights=current_weights, k=1)[0]
-        selected.add(pick)
-        
-    return sorted(list(selected))
+    return WeightedSampler(population, [frequencies.get(num, 0) + 1 for num in population])
+
+
+def weighted_choice(frequencies, k, pool_range, rng=random):
+    """
+    Selects k unique numbers from pool_range, weighted by their frequency.
+    If a number is not in frequencies, it gets a base weight (e.g., 1).
+    """
+    return build_sampler(frequencies, pool_range).sample(k, rng)
+
+
+def iter_miloto_predictions(freqs, count, rng=random):
+    """
+    Yields count MiLoto tickets from one frequency table ({'numbers': {...}}).
+    """
+    # MiLoto: 5 numbers from 1 to 39
+    sampler = build_sampler(freqs['numbers'], range(1, 40))
+    for _ in range(count):
+        yield {'numbers': sampler.sample(5, rng)}
+
+
+def iter_baloto_predictions(freqs, count, rng=random):
+    """
+    Yields count Baloto tickets from one frequency table ({'numbers': {...}, 'super': {...}}).
+    """
+    # Baloto: 5 numbers (1-43) + 1 Super (1-16)
+    sampler = build_sampler(freqs['numbers'], range(1, 44))
+    super_sampler = build_sampler(freqs['super'], range(1, 17))
+    for _ in range(count):
+        yield {'numbers': sampler.sample(5, rng), 'super_balota': super_sampler.sample(1, rng)[0]}
+
 
 def generate_miloto_prediction(history):
     freqs = calculate_frequencies(history)
-    # MiLoto: 5 numbers from 1 to 39
     # "5 MAS FRECUENTES" implied user wants highly frequent ones.
     # We use weighted random to make it "ALEATORIAMENTE... MAS FRECUENTES"
-    
-    prediction = weighted_choice(freqs['numbers'], 5, range(1, 40))
-    return {'numbers': prediction}
+    return next(iter_miloto_predictions(freqs, 1))
+
 
 def generate_baloto_prediction(history):
     freqs = calculate_frequencies(history)
-    # Baloto: 5 numbers (1-43) + 1 Super (1-16)
-    
-    numbers = weighted_choice(freqs['numbers'], 5, range(1, 44))
-    
-    # Super balota
-    # Weighted choice for 1 item
-    super_weights = [freqs['super'].get(x, 0) + 1 for x in range(1, 17)]
-    super_balota = random.choices(range(1, 17), weights=super_weights, k=1)[0]
-    
-    return {'numbers': numbers, 'super_balota': super_balota}
+    return next(iter_baloto_predictions(freqs, 1))
 
 
 # ============================================
 # PREDICTIVE ANALYTICS FUNCTIONS
 # ============================================
 
-def get_time_series_data(history, game_type):
+class HistoryStats:
+    """
+    The accumulators behind the predictive analytics: frequencies, last seen,
+    pairs, sums, half-split counts, position counters and super ball stats.
+    Each one is computed on first use and kept, so a single calculate_*
+    view only pays for what it reads. The comprehensive bundle calls fill()
+    instead, which reads the history once; the counters and the date-ordered
+    accumulators (halves, last seen) are then derived from the lists it
+    collected and one sort of their dates.
+
+    Counters are filled in history order, so most_common breaks ties the way
+    the per-function loops did. Newest-first positions follow
+    sorted(history, key=date, reverse=True), which keeps same-date draws in
+    history order.
+    """
+
+    def __init__(self, history, game_type=None):
+        self.history = history
+        self.total = len(history)
+        self.max_num = 43 if game_type == 'baloto' else 39
+
+    def fill(self):
+        """
+        Collects the rows, sorted rows, supers and dates in one pass over the
+        history and derives the frequency, sum and pair counters from those
+        lists, storing everything where the cached properties would. Returns self.
+        """
+        rows, ordered_rows, supers, dates = [], [], [], []
+        for draw in self.history:
+            numbers = draw['numbers']
+            rows.append(numbers)
+            ordered_rows.append(sorted(numbers))
+            supers.append(draw.get('super'))
+            dates.append(draw.get('date', ''))
+
+        # cached_property reads the instance __dict__ first
+        self.__dict__.update(
+            rows=rows, ordered_rows=ordered_rows, supers=supers, dates=dates,
+            _frequency_counts=(Counter(chain.from_iterable(rows)), Counter(s for s in supers if s is not None)),
+            sum_freq=Counter(map(sum, rows)),
+            pair_freq=Counter(chain.from_iterable(map(combinations, ordered_rows, repeat(2)))),
+        )
+        return self
+
+    @cached_property
+    def rows(self):
+        return [draw['numbers'] for draw in self.history]
+
+    @cached_property
+    def ordered_rows(self):
+        return [sorted(numbers) for numbers in self.rows]
+
+    @cached_property
+    def supers(self):
+        return [draw.get('super') for draw in self.history]
+
+    @cached_property
+    def dates(self):
+        return [draw.get('date', '') for draw in self.history]
+
+    @cached_property
+    def oldest(self):
+        """
+        Draw indices sorted by date.
+        """
+        return sorted(range(self.total), key=self.dates.__getitem__)
+
+    @cached_property
+    def newest(self):
+        """
+        Draw indices newest first; the sort is stable, so same-date draws
+        stay in history order.
+        """
+        return sorted(range(self.total), key=self.dates.__getitem__, reverse=True)
+
+    @cached_property
+    def _frequency_counts(self):
+        all_numbers = []
+        all_supers = []
+        for draw in self.history:
+            all_numbers.extend(draw['numbers'])
+            if draw.get('super') is not None:
+                all_supers.append(draw['super'])
+        return Counter(all_numbers), Counter(all_supers)
+
+    @property
+    def number_freq(self):
+        return self._frequency_counts[0]
+
+    @property
+    def super_freq(self):
+        return self._frequency_counts[1]
+
+    @cached_property
+    def sum_freq(self):
+        return Counter(map(sum, self.rows))
+
+    @cached_property
+    def pair_freq(self):
+        return Counter(chain.from_iterable(map(combinations, self.ordered_rows, repeat(2))))
+
+    @cached_property
+    def position_freq(self):
+        position_freq = []
+        for column in islice(zip_longest(*self.ordered_rows), 5):
+            counter = Counter(column)
+            counter.pop(None, None)  # Padding of draws with fewer numbers
+            position_freq.append(counter)
+        return position_freq + [Counter() for _ in range(5 - len(position_freq))]
+
+    @cached_property
+    def first_half_len(self):
+        return self.total // 2
+
+    @cached_property
+    def first_half_freq(self):
+        return Counter(chain.from_iterable(self.rows[idx] for idx in self.oldest[:self.first_half_len]))
+
+    @cached_property
+    def second_half_freq(self):
+        return Counter(chain.from_iterable(self.rows[idx] for idx in self.oldest[self.first_half_len:]))
+
+    @cached_property
+    def last_row(self):
+        """
+        Newest-first position of the latest draw of each number in the pool;
+        the walk stops once every number has been seen.
+        """
+        last_row = {}
+        missing = set(range(1, self.max_num + 1))
+        for row, idx in enumerate(self.newest):
+            for num in self.history[idx]['numbers']:
+                if num not in last_row:
+                    last_row[num] = row
+                    missing.discard(num)
+            if not missing:
+                break
+        return last_row
+
+    @cached_property
+    def last_date(self):
+        return {num: self.history[self.newest[row]].get('date', 'Unknown') for num, row in self.last_row.items()}
+
+    @cached_property
+    def super_last_row(self):
+        supers, newest = self.supers, self.newest
+        return {supers[newest[row]]: row for row in range(self.total - 1, -1, -1) if supers[newest[row]] is not None}
+
+    def frequencies(self):
+        return {'numbers': dict(self.number_freq), 'super': dict(self.super_freq)}
+
+    def hot_cold(self):
+        if not self.total:
+            return {'hot': [], 'cold': [], 'neutral': []}
+        return classify_hot_cold(self.number_freq, self.total, self.max_num)
+
+    def gaps(self):
+        if not self.total:
+            return []
+        result = [{'number': num, 'gap': self.last_row.get(num, self.total), 'last_seen': self.last_date.get(num)}
+                  for num in range(1, self.max_num + 1)]
+        result.sort(key=lambda x: x['gap'], reverse=True)
+        return result
+
+    def pairs(self):
+        return [{'pair': list(pair), 'frequency': freq} for pair, freq in self.pair_freq.most_common(20)]
+
+    def sum_distribution(self):
+        return summarize_sum_counts(self.sum_freq)
+
+    def trends(self):
+        if self.total < 5:
+            return {'trending_up': [], 'trending_down': [], 'stable': []}
+        return classify_trends(self.first_half_freq, self.second_half_freq,
+                               self.first_half_len, self.total - self.first_half_len, self.max_num)
+
+    def positions(self):
+        if not self.total:
+            return []
+        return summarize_positions(self.position_freq)
+
+    def super_analysis(self):
+        if not self.total:
+            return {'frequencies': [], 'hot': [], 'cold': [], 'gaps': []}
+        # Keyed in order of first appearance newest first, as the hot/cold lists expect
+        super_freq = Counter({num: self.super_freq[num]
+                              for num in sorted(self.super_last_row, key=self.super_last_row.get)})
+        return summarize_super(super_freq, self.super_last_row, self.total)
+
+
+@timed('get_time_series_data')
+def get_time_series_data(history, game_type, points=None):
     """
     Extracts time series data for trend analysis.
-    Returns data organized by date with frequency counts.
+    Returns the cumulative frequency of every number after each draw (or
+    after `points` evenly spaced draws), one row per draw so draws that
+    share a date are all kept:
+    {'dates': [...], 'numbers': [1..max], 'counts': [[...] per date], 'total_draws': int}
     """
     if not history:
-        return {'dates': [], 'frequencies': {}}
-    
-    # Sort by date
-    sorted_history = sorted(history, key=lambda x: x.get('date', ''))
+        return {'dates': [], 'numbers': [], 'counts': [], 'total_draws': 0}
     
-    # Group by date and calculate cumulative frequencies
-    dates = []
-    cumulative_freq = {}
-    running_total = Counter()
-    
-    for draw in sorted_history:
-        date = draw.get('date', '')
-        if date:
-            dates.append(date)
-            for num in draw['numbers']:
-                running_total[num] += 1
-            # Store snapshot of frequencies at this point
-            cumulative_freq[date] = dict(running_total)
-    
-    return {'dates': dates, 'frequencies': cumulative_freq}
+    max_num = 43 if game_type == 'baloto' else 39
+    series = FrequencySeries.from_draws(sorted(history, key=lambda x: x.get('date', '')), max_num)
+    indices = series.sample_indices(points) if points else range(len(series))
+    return series.to_dict(indices)
 
 
+@timed('calculate_hot_cold_numbers')
 def calculate_hot_cold_numbers(history, game_type):
     """
     Identifies hot (frequently appearing) and cold (rarely appearing) numbers.
     """
-    if not history:
-        return {'hot': [], 'cold': [], 'neutral': []}
-    
-    max_num = 43 if game_type == 'baloto' else 39
-    freqs = calculate_frequencies(history)
-    num_freq = freqs['numbers']
-    
+    return HistoryStats(history, game_type).hot_cold()
+
+
+def classify_hot_cold(num_freq, total_draws, max_num):
+    """
+    Splits the pool into hot, cold and neutral numbers given their frequencies.
+    """
     # Calculate average frequency
-    total_draws = len(history)
     expected_freq = (total_draws * 5) / max_num  # 5 numbers per draw
     
     hot = []
@@ -143,86 +376,59 @@ def calculate_hot_cold_numbers(history, game_type):
     return {'hot': hot[:10], 'cold': cold[:10], 'neutral': neutral}
 
 
+@timed('calculate_number_gaps')
 def calculate_number_gaps(history, game_type):
     """
     Calculates the gap (draws since last appearance) for each number.
     Useful for identifying overdue numbers.
     """
-    if not history:
-        return []
-    
-    max_num = 43 if game_type == 'baloto' else 39
-    sorted_history = sorted(history, key=lambda x: x.get('date', ''), reverse=True)
-    
-    gaps = {}
-    for num in range(1, max_num + 1):
-        gaps[num] = {'number': num, 'gap': len(sorted_history), 'last_seen': None}
-    
-    for idx, draw in enumerate(sorted_history):
-        for num in draw['numbers']:
-            if gaps[num]['last_seen'] is None:
-                gaps[num]['gap'] = idx
-                gaps[num]['last_seen'] = draw.get('date', 'Unknown')
-    
-    result = list(gaps.values())
-    result.sort(key=lambda x: x['gap'], reverse=True)
-    
-    return result
+    return HistoryStats(history, game_type).gaps()
 
 
+@timed('calculate_pair_frequency')
 def calculate_pair_frequency(history, game_type):
     """
     Analyzes which number pairs appear together most frequently.
     """
-    if not history:
-        return []
-    
-    pair_counter = Counter()
-    
-    for draw in history:
-        numbers = sorted(draw['numbers'])
-        # Generate all pairs
-        for i in range(len(numbers)):
-            for j in range(i + 1, len(numbers)):
-                pair = (numbers[i], numbers[j])
-                pair_counter[pair] += 1
-    
-    # Get top 20 pairs
-    top_pairs = pair_counter.most_common(20)
-    
-    return [{'pair': list(pair), 'frequency': freq} for pair, freq in top_pairs]
+    return HistoryStats(history, game_type).pairs()
 
 
+@timed('calculate_sum_distribution')
 def calculate_sum_distribution(history, game_type):
     """
     Analyzes the distribution of sum totals for all draws.
     Helps identify typical sum ranges.
     """
-    if not history:
+    return HistoryStats(history, game_type).sum_distribution()
+
+
+def summarize_sum_counts(sum_counts):
+    """
+    Builds the sum distribution summary from a Counter of {sum: occurrences}.
+    """
+    if not sum_counts:
         return {'distribution': [], 'average': 0, 'min': 0, 'max': 0, 'ranges': []}
     
-    sums = [sum(draw['numbers']) for draw in history]
-    
     # Create distribution buckets
-    min_sum = min(sums)
-    max_sum = max(sums)
-    avg_sum = sum(sums) / len(sums)
+    min_sum = min(sum_counts)
+    max_sum = max(sum_counts)
+    total = sum(sum_counts.values())
+    avg_sum = sum(s * c for s, c in sum_counts.items()) / total
     
     # Create 10 buckets
     bucket_size = max(1, (max_sum - min_sum) // 10)
     distribution = Counter()
     
-    for s in sums:
+    for s, count in sum_counts.items():
         bucket = ((s - min_sum) // bucket_size) * bucket_size + min_sum
-        distribution[bucket] += 1
+        distribution[bucket] += count
     
     dist_list = [{'range_start': k, 'range_end': k + bucket_size, 'count': v}
                  for k, v in sorted(distribution.items())]
     
     # Calculate recommended ranges (middle 60% of distribution)
-    sorted_sums = sorted(sums)
-    lower_idx = int(len(sorted_sums) * 0.2)
-    upper_idx = int(len(sorted_sums) * 0.8)
+    lower_idx = int(total * 0.2)
+    upper_idx = int(total * 0.8)
     
     return {
         'distribution': dist_list,
@@ -230,45 +436,46 @@ def calculate_sum_distribution(history, game_type):
         'min': min_sum,
         'max': max_sum,
         'recommended_range': {
-            'low': sorted_sums[lower_idx],
-            'high': sorted_sums[upper_idx]
+            'low': _sum_at_rank(sum_counts, lower_idx),
+            'high': _sum_at_rank(sum_counts, upper_idx)
         }
     }
 
 
+def _sum_at_rank(sum_counts, rank):
+    """
+    Returns the value at position `rank` of the sorted list of sums
+    described by `sum_counts`, without expanding it.
+    """
+    seen = 0
+    for s in sorted(sum_counts):
+        seen += sum_counts[s]
+        if seen > rank:
+            return s
+    return max(sum_counts)
+
+
+@timed('calculate_trend_analysis')
 def calculate_trend_analysis(history, game_type):
     """
     Performs trend analysis on number frequencies over time.
     Identifies numbers with increasing or decreasing trends.
     """
-    if len(history) < 5:
-        return {'trending_up': [], 'trending_down': [], 'stable': []}
-    
-    max_num = 43 if game_type == 'baloto' else 39
-    sorted_history = sorted(history, key=lambda x: x.get('date', ''))
-    
-    # Split into two halves for comparison
-    mid = len(sorted_history) // 2
-    first_half = sorted_history[:mid]
-    second_half = sorted_history[mid:]
-    
-    first_freq = Counter()
-    second_freq = Counter()
-    
-    for draw in first_half:
-        first_freq.update(draw['numbers'])
-    
-    for draw in second_half:
-        second_freq.update(draw['numbers'])
-    
+    return HistoryStats(history, game_type).trends()
+
+
+def classify_trends(first_freq, second_freq, first_len, second_len, max_num):
+    """
+    Compares per-number rates between the older and the newer half of history.
+    """
     # Normalize by number of draws
     trending_up = []
     trending_down = []
     stable = []
     
     for num in range(1, max_num + 1):
-        first_rate = first_freq.get(num, 0) / max(1, len(first_half))
-        second_rate = second_freq.get(num, 0) / max(1, len(second_half))
+        first_rate = first_freq.get(num, 0) / max(1, first_len)
+        second_rate = second_freq.get(num, 0) / max(1, second_len)
         
         change = second_rate - first_rate
         change_pct = (change / max(0.01, first_rate)) * 100 if first_rate > 0 else 100 if second_rate > 0 else 0
@@ -297,20 +504,18 @@ def calculate_trend_analysis(history, game_type):
     }
 
 
+@timed('calculate_position_analysis')
 def calculate_position_analysis(history, game_type):
     """
     Analyzes which numbers appear most frequently in each position.
     """
-    if not history:
-        return []
-    
-    position_freq = [Counter() for _ in range(5)]
-    
-    for draw in history:
-        sorted_nums = sorted(draw['numbers'])
-        for pos, num in enumerate(sorted_nums):
-            position_freq[pos][num] += 1
-    
+    return HistoryStats(history, game_type).positions()
+
+
+def summarize_positions(position_freq):
+    """
+    Returns the top 5 numbers for each of the five sorted positions.
+    """
     result = []
     for pos in range(5):
         top_5 = position_freq[pos].most_common(5)
@@ -322,23 +527,19 @@ def calculate_position_analysis(history, game_type):
     return result
 
 
+@timed('get_super_balota_analysis')
 def get_super_balota_analysis(history):
     """
     Specific analysis for Super Balota (Baloto only).
     """
-    if not history:
-        return {'frequencies': [], 'hot': [], 'cold': [], 'gaps': []}
-    
-    super_freq = Counter()
-    last_seen = {}
-    
-    for idx, draw in enumerate(sorted(history, key=lambda x: x.get('date', ''), reverse=True)):
-        super_num = draw.get('super')
-        if super_num is not None:
-            super_freq[super_num] += 1
-            if super_num not in last_seen:
-                last_seen[super_num] = idx
-    
+    return HistoryStats(history, 'baloto').super_analysis()
+
+
+def summarize_super(super_freq, last_seen, total_draws):
+    """
+    Builds the Super Balota summary from its frequencies and the number of
+    draws since each value was last seen.
+    """
     # Frequencies
     freq_list = [{'number': num, 'frequency': freq} for num, freq in sorted(super_freq.items())]
     
@@ -352,7 +553,7 @@ def get_super_balota_analysis(history):
     for num in range(1, 17):
         gaps.append({
             'number': num,
-            'gap': last_seen.get(num, len(history)),
+            'gap': last_seen.get(num, total_draws),
             'frequency': super_freq.get(num, 0)
         })
     gaps.sort(key=lambda x: x['gap'], reverse=True)
@@ -365,18 +566,22 @@ def get_super_balota_analysis(history):
     }
 
 
+@timed('get_comprehensive_prediction_data')
 def get_comprehensive_prediction_data(history, game_type):
     """
-    Aggregates all predictive analytics for a game type.
+    Aggregates all predictive analytics for a game type. The views share one
+    HistoryStats filled in a single pass, so the history is sorted by date
+    and each draw's numbers are sorted only once.
     """
+    stats = HistoryStats(history, game_type).fill()
     return {
-        'frequency_chart': calculate_frequencies(history),
-        'hot_cold': calculate_hot_cold_numbers(history, game_type),
-        'gaps': calculate_number_gaps(history, game_type),
-        'pairs': calculate_pair_frequency(history, game_type),
-        'sum_distribution': calculate_sum_distribution(history, game_type),
-        'trends': calculate_trend_analysis(history, game_type),
-        'position_analysis': calculate_position_analysis(history, game_type),
-        'super_analysis': get_super_balota_analysis(history) if game_type == 'baloto' else None,
+        'frequency_chart': stats.frequencies(),
+        'hot_cold': stats.hot_cold(),
+        'gaps': stats.gaps(),
+        'pairs': stats.pairs(),
+        'sum_distribution': stats.sum_distribution(),
+        'trends': stats.trends(),
+        'position_analysis': stats.positions(),
+        'super_analysis': stats.super_analysis() if game_type == 'baloto' else None,
         'total_draws': len(history)
     }
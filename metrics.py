@@ -0,0 +1,174 @@
+"""
+Lightweight instrumentation for SW BALOTO.
+`timed` (decorator or context manager) records how long a phase takes into
+a latency histogram; the registry renders everything in the Prometheus text
+format for /api/metrics. Timings taken while serving a request are also
+collected per request so the app can emit a Server-Timing header.
+"""
+from contextvars import ContextVar
+from functools import wraps
+import threading
+import time
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PHASE_METRIC = 'sw_baloto_phase_seconds'
+REQUEST_METRIC = 'sw_baloto_request_seconds'
+
+_request_timings = ContextVar('request_timings', default=None)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class MetricsRegistry:
+    """
+    Holds histograms by (name, labels) and collector callbacks for values
+    owned by other components (cache counters, dataset sizes...).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}
+        self._histograms = {}
+        self._collectors = []
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def register_collector(self, collector):
+        """
+        collector() returns a list of (name, type, help, [(labels dict, value)]).
+        """
+        self._collectors.append(collector)
+        return collector
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self):
+        lines = []
+        with self._lock:
+            by_name = {}
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                by_name.setdefault(name, []).append((dict(labels), histogram))
+
+            for name, series in by_name.items():
+                lines.append(f'# HELP {name} {self._help.get(name, name)}')
+                lines.append(f'# TYPE {name} histogram')
+                for labels, histogram in series:
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{_labels(labels, le=_number(bound))} {cumulative}')
+                    lines.append(f'{name}_bucket{_labels(labels, le="+Inf")} {histogram.count}')
+                    lines.append(f'{name}_sum{_labels(labels)} {_number(histogram.sum)}')
+                    lines.append(f'{name}_count{_labels(labels)} {histogram.count}')
+
+        for collector in self._collectors:
+            for name, metric_type, help_text, samples in collector():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_labels(labels)} {_number(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(labels, **extra):
+    items = list(labels.items()) + list(extra.items())
+    if not items:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for _, value in items)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(items, escaped)) + '}'
+
+
+registry = MetricsRegistry()
+registry.describe(PHASE_METRIC, 'Time spent in instrumented phases (scraping, parsing, analytics).')
+registry.describe(REQUEST_METRIC, 'HTTP request latency by route.')
+
+
+class timed:
+    """
+    Records the duration of a phase. Usable as a context manager
+    (`with timed('scraper.parse'):`) or as a decorator (`@timed('calculate_gaps')`).
+    """
+
+    def __init__(self, phase):
+        self.phase = phase
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        registry.observe(PHASE_METRIC, elapsed, phase=self.phase)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((self.phase, elapsed))
+        return False
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(self.phase):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def start_request_timings():
+    """
+    Starts collecting the phases timed during the current request.
+    Returns a token for finish_request_timings.
+    """
+    return _request_timings.set([])
+
+
+def finish_request_timings(token):
+    """
+    Stops collecting and returns [(phase, seconds)] for the request.
+    """
+    timings = _request_timings.get() or []
+    _request_timings.reset(token)
+    return timings
+
+
+def server_timing_header(timings, total=None):
+    """
+    Formats timings as a Server-Timing header value, summing repeated phases.
+    """
+    totals = {}
+    for phase, elapsed in timings:
+        totals[phase] = totals.get(phase, 0.0) + elapsed
+    if total is not None:
+        totals['total'] = total
+    return ', '.join(f'{phase};dur={elapsed * 1000:.3f}' for phase, elapsed in totals.items())
@@ -0,0 +1,252 @@
+"""
+Process-pool computation of the comprehensive analytics bundle.
+The draws of a DrawMatrix are copied once into a shared memory block and
+split into shards of rows. Each worker attaches to the block by name, counts
+its shard (number, super, sum, pair and position counts plus the first row
+at which each value appears) and returns those small arrays. The parent adds
+the counts, keeps the earliest first rows and builds the same payload as
+vectorized.get_comprehensive_prediction_data, ties included.
+
+Usage:
+    with ProcessPoolExecutor() as executor:
+        data = parallel.get_comprehensive_prediction_data(matrix, 'baloto', executor)
+"""
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import logic
+import vectorized
+from metrics import timed
+
+# Rows per shard; fixed so that the work split does not depend on the pool size
+SHARD_DRAWS = 131072
+
+# Smaller histories are computed in-process: starting the tasks costs more
+MIN_PARALLEL_DRAWS = 50000
+
+# Sentinel for "never seen" in first-row arrays
+NEVER = np.iinfo(np.int64).max
+
+# Value range of the uint8 super ball column
+SUPER_SIZE = 256
+
+
+# ============================================
+# SHARED MEMORY
+# ============================================
+
+class SharedDrawMatrix:
+    """
+    A DrawMatrix plus its newest-first and oldest-first row orders, copied
+    into one shared memory block. `spec` is what workers need to attach.
+    """
+
+    def __init__(self, matrix):
+        arrays = {
+            'numbers': matrix.numbers,
+            'supers': matrix.supers,
+            'ordinals': matrix.ordinals,
+            'newest': matrix.newest_first(),
+            'oldest': matrix.oldest_first(),
+        }
+        layout, offset = [], 0
+        for name, array in arrays.items():
+            layout.append((name, array.shape, array.dtype.str, offset))
+            offset += -(-array.nbytes // 8) * 8  # Keep every array 8-byte aligned
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for name, shape, dtype, start in layout:
+            np.ndarray(shape, dtype, buffer=self.shm.buf, offset=start)[...] = arrays[name]
+        self.spec = (self.shm.name, tuple(layout))
+        self.newest = arrays['newest']
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Worker side: the block attached last, as (name, SharedMemory, arrays)
+_attached = None
+
+
+def _attach(spec):
+    global _attached
+    name, layout = spec
+    if _attached is None or _attached[0] != name:
+        if _attached is not None:
+            previous = _attached[1]
+            _attached = None  # Drop the array views before closing the block
+            previous.close()
+        shm = shared_memory.SharedMemory(name=name)
+        arrays = {field: np.ndarray(shape, dtype, buffer=shm.buf, offset=start)
+                  for field, shape, dtype, start in layout}
+        _attached = (name, shm, arrays)
+    return _attached[2]
+
+
+# ============================================
+# SHARD COUNTS
+# ============================================
+
+def _first_rows(values, positions, size):
+    """
+    Smallest position at which each value in 0..size-1 appears (NEVER if absent).
+    """
+    first = np.full(size, NEVER, dtype=np.int64)
+    np.minimum.at(first, values, positions)
+    return first
+
+
+def count_shard(arrays, start, stop, size, mid):
+    """
+    Counts of one shard of the shared arrays. Row-order statistics use rows
+    start..stop; gaps and supers use those positions of the newest-first
+    order, and trends those of the oldest-first order (the first `mid` of
+    which form the older half). First appearances are global positions.
+    """
+    numbers = arrays['numbers'][start:stop]
+    ordered = np.sort(numbers, axis=1).astype(np.int64)
+    rows = np.arange(start, stop, dtype=np.int64)
+
+    # Pair codes in the order logic.py visits them, for first-appearance ties
+    codes = np.stack([ordered[:, i] * size + ordered[:, j] for i, j in vectorized.PAIR_COLUMNS], axis=1).ravel()
+    code_positions = np.arange(len(codes), dtype=np.int64) + start * len(vectorized.PAIR_COLUMNS)
+
+    newest = arrays['newest'][start:stop]
+    newest_supers = arrays['supers'][newest].astype(np.int64)
+    present = np.flatnonzero(newest_supers)
+
+    oldest = arrays['oldest'][start:stop]
+    older = max(0, min(stop, mid) - start)
+
+    return {
+        'numbers': np.bincount(numbers.ravel(), minlength=size),
+        'supers': np.bincount(arrays['supers'][start:stop], minlength=SUPER_SIZE),
+        'sums': np.bincount(ordered.sum(axis=1), minlength=5 * size),
+        'pairs': vectorized.pair_matrix(vectorized.DrawMatrix(numbers, None, None), size - 1),
+        'pair_first': _first_rows(codes, code_positions, size * size),
+        'position_counts': np.stack([np.bincount(ordered[:, pos], minlength=size) for pos in range(5)]),
+        'position_first': np.stack([_first_rows(ordered[:, pos], rows, size) for pos in range(5)]),
+        'gap_first': _first_rows(arrays['numbers'][newest].ravel(), rows.repeat(5), size),
+        'super_first': _first_rows(newest_supers[present], present + start, SUPER_SIZE),
+        'trend': np.stack([np.bincount(arrays['numbers'][oldest[:older]].ravel(), minlength=size),
+                           np.bincount(arrays['numbers'][oldest[older:]].ravel(), minlength=size)]),
+    }
+
+
+def _count_shard_task(spec, start, stop, size, mid):
+    return count_shard(_attach(spec), start, stop, size, mid)
+
+
+def merge_counts(shards):
+    """
+    Adds the counts of every shard and keeps the earliest first appearances.
+    """
+    merged = {}
+    for key in ('numbers', 'supers', 'sums', 'pairs', 'position_counts', 'trend'):
+        merged[key] = sum(shard[key] for shard in shards)
+    for key in ('pair_first', 'position_first', 'gap_first', 'super_first'):
+        merged[key] = np.minimum.reduce([shard[key] for shard in shards])
+    return merged
+
+
+# ============================================
+# PAYLOAD
+# ============================================
+
+def _most_common(counts, first, k):
+    """
+    Counter.most_common(k) from counts and first appearance of each value.
+    """
+    present = np.flatnonzero(counts)
+    order = np.lexsort((first[present], -counts[present]))[:k]
+    return [(int(v), int(counts[v])) for v in present[order]]
+
+
+def build_payload(merged, matrix, newest, game_type, size):
+    """
+    The comprehensive payload from merged shard counts, identical to
+    vectorized.get_comprehensive_prediction_data.
+    """
+    n = len(matrix)
+    max_num = vectorized._max_number(game_type)
+    number_counts = merged['numbers']
+    super_counts = merged['supers'].copy()
+    super_counts[0] = 0
+
+    gaps = []
+    for num in range(1, max_num + 1):
+        row = int(merged['gap_first'][num]) if num < size else NEVER
+        if row == NEVER:
+            gaps.append({'number': num, 'gap': n, 'last_seen': None})
+        else:
+            ordinal = int(matrix.ordinals[newest[row]])
+            gaps.append({'number': num, 'gap': row, 'last_seen': vectorized._ordinal_to_date(ordinal)})
+    gaps.sort(key=lambda x: x['gap'], reverse=True)
+
+    pair_counts = np.triu(merged['pairs'], 1).ravel()
+    top_pairs = _most_common(pair_counts, merged['pair_first'], 20)
+
+    positions = []
+    for pos in range(5):
+        top_5 = _most_common(merged['position_counts'][pos], merged['position_first'][pos], 5)
+        positions.append({'position': pos + 1,
+                          'top_numbers': [{'number': num, 'frequency': freq} for num, freq in top_5]})
+
+    if n < 5:
+        trends = {'trending_up': [], 'trending_down': [], 'stable': []}
+    else:
+        mid = n // 2
+        trends = logic.classify_trends(vectorized._counts_dict(merged['trend'][0]),
+                                       vectorized._counts_dict(merged['trend'][1]), mid, n - mid, max_num)
+
+    super_analysis = None
+    if game_type == 'baloto':
+        seen = np.flatnonzero(merged['super_first'] != NEVER)
+        # Insertion order of the Counter in logic.py: first appearance, newest first
+        last_seen = {int(num): int(merged['super_first'][num])
+                     for num in seen[np.argsort(merged['super_first'][seen], kind='stable')]}
+        super_freq = {num: int(merged['supers'][num]) for num in last_seen}
+        super_analysis = logic.summarize_super(super_freq, last_seen, n)
+
+    return {
+        'frequency_chart': {'numbers': vectorized._counts_dict(number_counts),
+                            'super': vectorized._counts_dict(super_counts)},
+        'hot_cold': logic.classify_hot_cold(vectorized._counts_dict(number_counts), n, max_num),
+        'gaps': gaps,
+        'pairs': [{'pair': [code // size, code % size], 'frequency': freq} for code, freq in top_pairs],
+        'sum_distribution': logic.summarize_sum_counts(vectorized._counts_dict(merged['sums'])),
+        'trends': trends,
+        'position_analysis': positions,
+        'super_analysis': super_analysis,
+        'total_draws': n
+    }
+
+
+@timed('parallel.get_comprehensive_prediction_data')
+def get_comprehensive_prediction_data(matrix, game_type, executor=None):
+    """
+    Same result as vectorized.get_comprehensive_prediction_data. With an
+    executor (a ProcessPoolExecutor) and at least MIN_PARALLEL_DRAWS draws,
+    the shards are counted by its workers from one shared memory block.
+    """
+    n = len(matrix)
+    if executor is None or n < MIN_PARALLEL_DRAWS:
+        return vectorized.get_comprehensive_prediction_data(matrix, game_type)
+
+    size = max(vectorized._max_number(game_type), int(matrix.numbers.max())) + 1
+    bounds = [(start, min(start + SHARD_DRAWS, n)) for start in range(0, n, SHARD_DRAWS)]
+
+    with SharedDrawMatrix(matrix) as shared:
+        futures = [executor.submit(_count_shard_task, shared.spec, start, stop, size, n // 2)
+                   for start, stop in bounds]
+        shards = [future.result() for future in futures]
+
+    return build_payload(merge_counts(shards), matrix, shared.newest, game_type, size)
@@ -0,0 +1,149 @@
+"""
+On-disk draw history for SW BALOTO.
+Draws are kept in a SQLite database in WAL mode so the store can write
+through on every fetch and reload the whole history quickly at startup.
+"""
+import os
+import sqlite3
+import sys
+import threading
+
+DB_FILENAME = 'sw_baloto.db'
+
+# Bytes of the database file read through a shared memory map, so the
+# workers of a multi-process server share one copy in the page cache
+MMAP_SIZE = 256 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS draws (
+    game TEXT NOT NULL,
+    date TEXT NOT NULL,
+    numbers TEXT NOT NULL,
+    super INTEGER,
+    UNIQUE (game, date, numbers)
+);
+CREATE INDEX IF NOT EXISTS idx_draws_game_date ON draws (game, date);
+CREATE TABLE IF NOT EXISTS backfill_state (
+    game TEXT PRIMARY KEY,
+    next_page INTEGER NOT NULL,
+    complete INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def default_db_path():
+    """
+    Location of the database: $SW_BALOTO_DB if set, otherwise next to the
+    executable (PyInstaller build) or next to this file.
+    """
+    if os.environ.get('SW_BALOTO_DB'):
+        return os.environ['SW_BALOTO_DB']
+    if getattr(sys, 'frozen', False):
+        base_dir = os.path.dirname(sys.executable)
+    else:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_dir, DB_FILENAME)
+
+
+def _encode_numbers(numbers):
+    return ','.join(str(n) for n in sorted(numbers))
+
+
+def _decode_row(game, date, numbers, super_num):
+    draw = {'date': date, 'type': game, 'numbers': list(map(int, numbers.split(',')))}
+    if super_num is not None:
+        draw['super'] = super_num
+    return draw
+
+
+class DrawDatabase:
+    def __init__(self, path=None):
+        self.path = path or default_db_path()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(f'PRAGMA mmap_size={MMAP_SIZE}')
+        self._conn.executescript(SCHEMA)
+
+    def insert_many(self, draws):
+        """
+        Writes draws in a single transaction, ignoring ones already stored.
+        """
+        rows = [(d['type'], d.get('date', ''), _encode_numbers(d['numbers']), d.get('super')) for d in draws]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO draws (game, date, numbers, super) VALUES (?, ?, ?, ?)', rows)
+
+    def load(self, game_type=None, start=None, end=None):
+        """
+        Returns stored draws ordered by game, date and insertion order.
+        All filters are optional; start/end are inclusive 'YYYY-MM-DD' dates.
+        """
+        query = 'SELECT game, date, numbers, super FROM draws'
+        clauses = []
+        params = []
+        if game_type:
+            clauses.append('game = ?')
+            params.append(game_type)
+        if start:
+            clauses.append('date >= ?')
+            params.append(start)
+        if end:
+            clauses.append('date <= ?')
+            params.append(end)
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        query += ' ORDER BY game, date, rowid'
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [_decode_row(*row) for row in rows]
+
+    def load_after(self, rowid):
+        """
+        Draws stored after row `rowid`, ordered like load, and the last rowid
+        read: (draws, rowid). Used to pick up rows written by other processes.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT rowid, game, date, numbers, super FROM draws WHERE rowid > ? ORDER BY game, date, rowid',
+                (rowid,)).fetchall()
+        last = max((row[0] for row in rows), default=rowid)
+        return [_decode_row(*row[1:]) for row in rows], last
+
+    def data_version(self):
+        """
+        Changes whenever another connection (or process) commits to the database.
+        """
+        with self._lock:
+            return self._conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def count(self, game_type=None):
+        with self._lock:
+            if game_type:
+                return self._conn.execute('SELECT COUNT(*) FROM draws WHERE game = ?', (game_type,)).fetchone()[0]
+            return self._conn.execute('SELECT COUNT(*) FROM draws').fetchone()[0]
+
+    def get_checkpoint(self, game_type):
+        """
+        Backfill progress for a game: {'next_page': int, 'complete': bool}.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT next_page, complete FROM backfill_state WHERE game = ?', (game_type,)).fetchone()
+        if row is None:
+            return {'next_page': 1, 'complete': False}
+        return {'next_page': row[0], 'complete': bool(row[1])}
+
+    def save_checkpoint(self, game_type, next_page, complete):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO backfill_state (game, next_page, complete) VALUES (?, ?, ?)',
+                (game_type, next_page, int(complete)))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,306 @@
+"""
+Statistical randomness tests over the stored draws of a game.
+Under fair draws every ticket of 5 distinct numbers is equally likely, so each
+number appears in a draw with probability p = 5 / pool, independently of
+earlier draws. The tests below check that on the history, with p-values:
+
+    uniformity         chi-square over all number counts (and super balls)
+    per number         binomial z-test of its count (the grounded hot / cold)
+    runs               Wald-Wolfowitz runs of each number's drawn / not drawn
+                       sequence, and of draw sums above / below their median
+    serial correlation lag-1 autocorrelation of each number's sequence, and
+                       Ljung-Box over the first lags of the draw sums
+    gaps               chi-square of the draws between appearances against
+                       the geometric distribution, pooled and per number
+
+Everything is computed on an (N, pool) presence matrix with NumPy; p-values
+use the normal and chi-square distributions (no SciPy needed).
+"""
+import math
+
+import numpy as np
+
+import vectorized
+
+# Significance level; per-number tests use it with a Bonferroni correction
+ALPHA = 0.05
+
+# Equal-probability bins of the gap distribution
+GAP_BINS = 10
+
+# Smallest expected count per bin for a gap chi-square to be reported
+MIN_EXPECTED = 5
+
+# Lags of the draw-sum autocorrelation (Ljung-Box)
+SUM_LAGS = 10
+
+SUPER_POOL = 16
+
+
+# ============================================
+# DISTRIBUTIONS
+# ============================================
+
+def normal_sf_two_sided(z):
+    """
+    P(|Z| >= |z|) for a standard normal Z.
+    """
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+def _gamma_q(a, x):
+    """
+    Regularized upper incomplete gamma function Q(a, x): series below
+    a + 1, continued fraction (modified Lentz) above.
+    """
+    if x <= 0:
+        return 1.0
+    log_prefix = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1.0 / a
+        n = a
+        while abs(term) > abs(total) * 1e-15:
+            n += 1
+            term *= x / n
+            total += term
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return min(1.0, h * math.exp(log_prefix))
+
+
+def chi2_sf(statistic, df):
+    """
+    P(X >= statistic) for a chi-square X with df degrees of freedom.
+    """
+    return _gamma_q(df / 2, statistic / 2)
+
+
+def _value(x, digits=6):
+    """
+    JSON-friendly float with `digits` significant digits; None for NaN / inf.
+    """
+    x = float(x)
+    return float(f'{x:.{digits}g}') if math.isfinite(x) else None
+
+
+def _chi2_result(statistic, df):
+    if df < 1 or not math.isfinite(statistic):
+        return {'statistic': None, 'df': df, 'p_value': None}
+    return {'statistic': _value(statistic), 'df': df, 'p_value': _value(chi2_sf(statistic, df))}
+
+
+# ============================================
+# TESTS
+# ============================================
+
+def presence_matrix(numbers, pool):
+    """
+    (N, pool) bool array: row t, column i is whether number i + 1 was drawn in draw t.
+    """
+    presence = np.zeros((len(numbers), pool + 1), dtype=bool)
+    # Numbers outside the pool go to column 0, which is dropped
+    presence[np.arange(len(numbers))[:, None], np.where(numbers <= pool, numbers, 0)] = True
+    return presence[:, 1:]
+
+
+def uniformity(counts, draws, picks):
+    """
+    Chi-square of number counts against equal frequencies. Numbers of one
+    draw are distinct, so counts are negatively correlated: the usual
+    statistic is scaled by (pool - 1) / (pool - picks) to stay chi-square
+    with pool - 1 degrees of freedom.
+    """
+    pool = len(counts)
+    expected = draws * picks / pool
+    if not expected or picks >= pool:
+        return _chi2_result(float('nan'), pool - 1)
+    statistic = ((counts - expected) ** 2).sum() / expected * (pool - 1) / (pool - picks)
+    return _chi2_result(statistic, pool - 1)
+
+
+def runs_test(sequences):
+    """
+    Wald-Wolfowitz runs test of each column of an (N, k) bool array.
+    Returns (runs, z, two-sided p) arrays; z and p are NaN for constant columns.
+    """
+    n = len(sequences)
+    ones = sequences.sum(axis=0).astype(np.float64)
+    zeros = n - ones
+    runs = 1 + (sequences[1:] != sequences[:-1]).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = 2 * ones * zeros / n + 1
+        variance = 2 * ones * zeros * (2 * ones * zeros - n) / (n * n * (n - 1))
+        z = (runs - mean) / np.sqrt(variance)
+    p = np.array([normal_sf_two_sided(v) if math.isfinite(v) else np.nan for v in z])
+    return runs, z, p
+
+
+def autocorrelation(series, lags):
+    """
+    Autocorrelation of each column of an (N, k) array at lags 1..lags, as a (lags, k) array.
+    """
+    centered = series - series.mean(axis=0)
+    denominator = (centered ** 2).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.array([(centered[lag:] * centered[:-lag]).sum(axis=0) / denominator
+                         for lag in range(1, lags + 1)])
+
+
+def gap_bins(probability, bins=GAP_BINS):
+    """
+    Upper edges of about equally likely bins of a geometric gap G >= 1
+    (P(G > k) = (1 - probability) ** k); the last bin is open. Returns
+    (edges, bin probabilities).
+    """
+    log_q = math.log1p(-probability)
+    edges = sorted({max(1, round(math.log1p(-i / bins) / log_q)) for i in range(1, bins)})
+    tails = [1.0] + [math.exp(edge * log_q) for edge in edges] + [0.0]
+    return np.array(edges), np.array(tails[:-1]) - np.array(tails[1:])
+
+
+def appearance_gaps(presence):
+    """
+    Draws between consecutive appearances of every number, as two arrays:
+    the number index (number - 1) and the gap of each pair of appearances.
+    """
+    # Appearances ordered by number, then by draw
+    columns, rows = np.nonzero(presence.T)
+    same = columns[1:] == columns[:-1]
+    return columns[1:][same], np.diff(rows)[same]
+
+
+def gap_test(gaps, probability, estimated=0):
+    """
+    Chi-square of gaps against a geometric distribution with the given
+    probability; `estimated` parameters (fitted from the gaps) reduce the
+    degrees of freedom. Returns (result, observed, expected, edges); the
+    p-value is None when some bin expects fewer than MIN_EXPECTED gaps.
+    """
+    edges, bin_probability = gap_bins(probability)
+    observed = np.bincount(np.searchsorted(edges, gaps, side='left'), minlength=len(edges) + 1)
+    expected = len(gaps) * bin_probability
+    df = len(edges) - estimated
+    if not len(gaps) or expected.min() < MIN_EXPECTED:
+        return _chi2_result(float('nan'), df), observed, expected, edges
+    return _chi2_result((((observed - expected) ** 2) / expected).sum(), df), observed, expected, edges
+
+
+def run_tests(matrix, game_type):
+    """
+    Randomness tests of a DrawMatrix of date-sorted draws. Returns
+    {'total_draws', 'alpha', 'uniformity', 'super_uniformity', 'numbers': [per
+    number: frequency, expected, z, p_value, status, runs, serial and gap
+    tests], 'gaps': pooled gap test with its bins, 'sums': runs and Ljung-Box}.
+    A number is 'hot' / 'cold' only when its p-value is below alpha / pool.
+    """
+    pool = vectorized._max_number(game_type)
+    picks = matrix.numbers.shape[1]
+    n = len(matrix)
+    probability = picks / pool
+    presence = presence_matrix(matrix.numbers.astype(np.int64), pool)
+    counts = presence.sum(axis=0)
+
+    # Per-number binomial z-test: count ~ Binomial(n, picks / pool)
+    expected = n * probability
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (counts - expected) / math.sqrt(n * probability * (1 - probability))
+    count_p = [normal_sf_two_sided(v) if math.isfinite(v) else math.nan for v in z]
+    threshold = ALPHA / pool
+
+    runs, runs_z, runs_p = runs_test(presence) if n > 1 else (np.zeros(pool),) + (np.full(pool, np.nan),) * 2
+    serial = autocorrelation(presence.astype(np.float64), 1)[0] if n > 1 else np.full(pool, np.nan)
+    serial_p = [normal_sf_two_sided(r * math.sqrt(n)) if math.isfinite(r) else math.nan for r in serial]
+
+    gap_numbers, gaps = appearance_gaps(presence)
+    # Split by number; each number's gaps are tested against its own fitted rate
+    by_number = np.split(gaps, np.searchsorted(gap_numbers, np.arange(1, pool)))
+
+    numbers = []
+    for i in range(pool):
+        own = by_number[i]
+        rate = 1 / own.mean() if len(own) else 0
+        if 0 < rate < 1:
+            number_gaps = gap_test(own, rate, estimated=1)[0]
+        else:
+            number_gaps = _chi2_result(float('nan'), 0)
+
+        status = 'normal'
+        if count_p[i] < threshold:
+            status = 'hot' if z[i] > 0 else 'cold'
+        numbers.append({
+            'number': i + 1,
+            'frequency': int(counts[i]),
+            'expected': _value(expected),
+            'z': _value(z[i]),
+            'p_value': _value(count_p[i]),
+            'status': status,
+            'runs': {'runs': int(runs[i]), 'z': _value(runs_z[i]), 'p_value': _value(runs_p[i])},
+            'serial_correlation': {'lag_1': _value(serial[i]), 'p_value': _value(serial_p[i])},
+            'gaps': number_gaps,
+        })
+
+    # Pooled over every number, against the fair rate picks / pool
+    pooled_test, observed, gap_expected, edges = gap_test(gaps, probability)
+    gap_edges = [0] + edges.tolist()
+    gap_rows = [{'from': gap_edges[b] + 1, 'to': gap_edges[b + 1] if b < len(edges) else None,
+                 'observed': int(observed[b]), 'expected': _value(gap_expected[b])}
+                for b in range(len(observed))]
+
+    super_uniformity = None
+    if game_type == 'baloto':
+        supers = matrix.supers[(matrix.supers > 0) & (matrix.supers <= SUPER_POOL)]
+        super_counts = np.bincount(supers, minlength=SUPER_POOL + 1)[1:]
+        super_uniformity = uniformity(super_counts, len(supers), 1)
+
+    return {
+        'total_draws': n,
+        'alpha': ALPHA,
+        'uniformity': uniformity(counts, n, picks),
+        'super_uniformity': super_uniformity,
+        'numbers': numbers,
+        'gaps': dict(pooled_test, bins=gap_rows),
+        'sums': _sum_tests(matrix.numbers.astype(np.int64).sum(axis=1)),
+    }
+
+
+def _sum_tests(sums):
+    """
+    Runs above / below the median and Ljung-Box autocorrelation of draw sums.
+    """
+    n = len(sums)
+    result = {'runs': {'runs': 0, 'z': None, 'p_value': None},
+              'autocorrelation': [], 'ljung_box': _chi2_result(float('nan'), SUM_LAGS)}
+    if n < 2:
+        return result
+
+    # Sums equal to the median belong to neither side
+    median = np.median(sums)
+    sides = (sums[sums != median] > median)[:, None]
+    if len(sides) > 1:
+        runs, z, p = runs_test(sides)
+        result['runs'] = {'runs': int(runs[0]), 'z': _value(z[0]), 'p_value': _value(p[0])}
+
+    lags = min(SUM_LAGS, n - 2)
+    if lags >= 1:
+        r = autocorrelation(sums[:, None].astype(np.float64), lags)[:, 0]
+        statistic = n * (n + 2) * (r ** 2 / (n - np.arange(1, lags + 1))).sum()
+        result['autocorrelation'] = [_value(v) for v in r]
+        result['ljung_box'] = _chi2_result(statistic, lags)
+    return result
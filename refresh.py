@@ -0,0 +1,209 @@
+"""
+Background refresh of the latest results.
+A single worker thread runs refresh jobs: requested from the UI, or scheduled
+shortly after each Baloto and MiLoto draw once the launcher calls start(). Requests that arrive while a job is
+queued or running join that job instead of starting another scrape. Each job
+publishes everything it fetched into the store in one write, and nothing at
+all when either source fails to scrape.
+"""
+from collections import OrderedDict
+from datetime import datetime, time, timedelta, timezone
+import threading
+import uuid
+
+import scraper
+
+# Draw days per game (Monday = 0); draws take place in the evening, Colombia time
+DRAW_SCHEDULE = {
+    'baloto': (2, 5),      # Wednesday, Saturday
+    'miloto': (0, 1, 3, 4),  # Monday, Tuesday, Thursday, Friday
+}
+DRAW_TIMEZONE = timezone(timedelta(hours=-5), 'COT')
+
+# Time of day at which results are usually published
+REFRESH_TIME = time(23, 0)
+
+# A scheduled refresh that finds nothing new is retried this often, a few times
+RETRY_DELAY = timedelta(minutes=30)
+MAX_RETRIES = 3
+
+# Finished jobs kept for /api/jobs/<id>
+MAX_JOBS = 50
+
+
+def next_refresh(now, schedule=DRAW_SCHEDULE, at=REFRESH_TIME):
+    """
+    Returns the first scheduled refresh strictly after `now` (an aware datetime).
+    """
+    weekdays = set().union(*schedule.values())
+    for offset in range(8):
+        day = now.date() + timedelta(days=offset)
+        if day.weekday() in weekdays:
+            candidate = datetime.combine(day, at, tzinfo=now.tzinfo)
+            if candidate > now:
+                return candidate
+    return None
+
+
+class RefreshWorker:
+    """
+    Runs refresh jobs on a daemon thread.
+    Job structure: {'id': str, 'status': 'queued'|'running'|'done'|'error',
+    'trigger': 'manual'|'schedule', 'created_at', 'started_at', 'finished_at',
+    'added': int, 'count': int, 'message': str, 'error': str|None}
+    """
+
+    def __init__(self, store, fetch=None, schedule=DRAW_SCHEDULE, clock=None, max_jobs=MAX_JOBS):
+        self.store = store
+        self.fetch = fetch or scraper.get_all_results
+        self.schedule = schedule  # None disables scheduled refreshes
+        self.clock = clock or (lambda: datetime.now(DRAW_TIMEZONE))
+        self.max_jobs = max_jobs
+        self.next_scheduled = None
+        self._jobs = OrderedDict()
+        self._pending = None
+        self._current = None
+        self._retries = 0
+        self._stopping = False
+        self._thread = None
+        self._cond = threading.Condition()
+
+    def start(self):
+        """
+        Starts scheduled refreshes and the worker thread. Called once by the
+        process that owns the schedule (launcher.py, app.py main), never by
+        a request: under a multi-process server each worker would otherwise
+        run its own schedule and scrape the source once per worker.
+        """
+        with self._cond:
+            if self.schedule and self.next_scheduled is None:
+                self.next_scheduled = next_refresh(self.clock(), self.schedule)
+                self._cond.notify_all()
+        self._ensure_thread()
+
+    def stop(self, timeout=None):
+        with self._cond:
+            self._stopping = True
+            self.next_scheduled = None
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _ensure_thread(self):
+        """
+        Starts the worker thread if it is not running yet.
+        """
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='refresh-worker', daemon=True)
+            self._thread.start()
+
+    def request(self, trigger='manual'):
+        """
+        Asks for a refresh. Returns the queued or running job if there is
+        one, otherwise queues a new job. Returns a copy of the job.
+        Runs the job without starting scheduled refreshes (see start).
+        """
+        with self._cond:
+            job = self._pending or self._current
+            if job is None:
+                job = self._pending = self._new_job(trigger)
+                self._cond.notify_all()
+            snapshot = dict(job)
+        self._ensure_thread()
+        return snapshot
+
+    def get(self, job_id):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def jobs(self):
+        """
+        Returns copies of the known jobs, newest first.
+        """
+        with self._cond:
+            return [dict(job) for job in reversed(self._jobs.values())]
+
+    def _new_job(self, trigger):
+        job = {
+            'id': uuid.uuid4().hex,
+            'status': 'queued',
+            'trigger': trigger,
+            'created_at': self.clock().isoformat(timespec='seconds'),
+            'started_at': None,
+            'finished_at': None,
+            'added': 0,
+            'count': None,
+            'message': None,
+            'error': None,
+        }
+        self._jobs[job['id']] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+        return job
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopping:
+                    if self.next_scheduled is None:
+                        self._cond.wait()
+                        continue
+                    timeout = (self.next_scheduled - self.clock()).total_seconds()
+                    if timeout <= 0:
+                        self._pending = self._new_job('schedule')
+                        break
+                    self._cond.wait(timeout)
+                if self._stopping:
+                    return
+
+                job = self._current = self._pending
+                self._pending = None
+                job['status'] = 'running'
+                job['started_at'] = self.clock().isoformat(timespec='seconds')
+
+            self._execute(job)
+
+    def _execute(self, job):
+        added = []
+        try:
+            baloto_data, miloto_data = self.fetch()
+            # A single extend: the whole result set is published in one write
+            added = self.store.extend(baloto_data + miloto_data)
+            status, message, error = 'done', f'Fetched {len(added)} new results.', None
+        except scraper.ScrapeError as e:
+            # Blocked or changed pages: the job fails and the store is left untouched
+            status, message, error = 'error', f'Scraping failed: {e}', str(e)
+        except Exception as e:
+            status, message, error = 'error', str(e), str(e)
+
+        with self._cond:
+            job.update({
+                'status': status,
+                'finished_at': self.clock().isoformat(timespec='seconds'),
+                'added': len(added),
+                'count': len(self.store),
+                'message': message,
+                'error': error,
+            })
+            self._current = None
+            if self.schedule:
+                self._schedule_next(job)
+
+    def _schedule_next(self, job):
+        if job['trigger'] != 'schedule':
+            # Manual refreshes leave the schedule untouched
+            return
+        now = self.clock()
+        upcoming = next_refresh(now, self.schedule)
+        if not job['added'] and self._retries < MAX_RETRIES:
+            # Results may not be published yet
+            self._retries += 1
+            self.next_scheduled = min(now + RETRY_DELAY, upcoming)
+        else:
+            self._retries = 0
+            self.next_scheduled = upcoming
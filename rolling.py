@@ -0,0 +1,279 @@
+"""
+Rolling-window analytics for SW BALOTO.
+A window covers the last N draws ('100') or the last D days ('30d') before
+each point of a series. The window slides forward over the date-sorted draws
+of a partition: the counters add each incoming draw and subtract each
+outgoing one, so the whole series costs O(history + points x ball pool)
+instead of recomputing every window from scratch.
+"""
+from collections import Counter
+from datetime import date, timedelta
+import bisect
+import heapq
+import math
+import re
+
+import logic
+from analytics import MAX_NUMBERS, _by_key
+
+SPAN_PATTERN = re.compile(r'^(\d+)(d?)$')
+
+# Points returned when no step is given, and the most a series may have
+DEFAULT_POINTS = 200
+MAX_POINTS = 5000
+
+# Route name -> keys of the comprehensive payload computed for each point
+ANALYSIS_VIEWS = {
+    'comprehensive': ('frequency_chart', 'hot_cold', 'gaps', 'pairs', 'sum_distribution', 'trends',
+                      'position_analysis', 'super_analysis'),
+    'hot-cold': ('hot_cold',),
+    'gaps': ('gaps',),
+    'trends': ('trends',),
+    'pairs': ('pairs',),
+    'sum-distribution': ('sum_distribution',),
+    'positions': ('position_analysis',),
+}
+
+
+def parse_span(text):
+    """
+    Parses '100' (draws) or '30d' (days) into (100, 'draws') / (30, 'days').
+    Raises ValueError for anything else.
+    """
+    match = SPAN_PATTERN.match(text or '')
+    if not match or int(match.group(1)) < 1:
+        raise ValueError(f'Invalid span: {text!r}')
+    return int(match.group(1)), 'days' if match.group(2) else 'draws'
+
+
+def _parse_date(date_str):
+    try:
+        return date.fromisoformat(date_str)
+    except (TypeError, ValueError):
+        return None
+
+
+def _decrement(counter, key, amount=1):
+    if counter[key] == amount:
+        del counter[key]
+    else:
+        counter[key] -= amount
+
+
+class WindowCounters:
+    """
+    Counters over a contiguous run of draws. `add` and `remove` touch only
+    the draw's own numbers (and its ten pairs when pairs are tracked).
+    """
+
+    def __init__(self, detail=True, pairs=False):
+        self.detail = detail
+        self.pairs = pairs
+        self.size = 0
+        self.number_freq = Counter()
+        self.super_freq = Counter()
+        self.sum_freq = Counter()
+        self.position_freq = [Counter() for _ in range(5)]
+        self.pair_freq = Counter()
+
+    def add(self, draw):
+        numbers = sorted(draw['numbers'])
+        self.size += 1
+        self.number_freq.update(numbers)
+        if self.detail:
+            self.sum_freq[sum(numbers)] += 1
+            for pos, num in enumerate(numbers[:5]):
+                self.position_freq[pos][num] += 1
+            if draw.get('super') is not None:
+                self.super_freq[draw['super']] += 1
+        if self.pairs:
+            for i in range(len(numbers)):
+                for j in range(i + 1, len(numbers)):
+                    self.pair_freq[(numbers[i], numbers[j])] += 1
+
+    def remove(self, draw):
+        numbers = sorted(draw['numbers'])
+        self.size -= 1
+        for num in numbers:
+            _decrement(self.number_freq, num)
+        if self.detail:
+            _decrement(self.sum_freq, sum(numbers))
+            for pos, num in enumerate(numbers[:5]):
+                _decrement(self.position_freq[pos], num)
+            if draw.get('super') is not None:
+                _decrement(self.super_freq, draw['super'])
+        if self.pairs:
+            for i in range(len(numbers)):
+                for j in range(i + 1, len(numbers)):
+                    _decrement(self.pair_freq, (numbers[i], numbers[j]))
+
+
+def _window_ends(dates, window, step):
+    """
+    Exclusive end indices of the windows in the series, oldest first.
+    The latest draw always ends a window; earlier windows are only kept
+    when history covers them completely.
+    """
+    n = len(dates)
+    span, unit = window
+    step_size, step_unit = step
+
+    if step_unit == 'draws':
+        ends = list(range(n, 0, -step_size))
+    else:
+        valid = [d for d in (_parse_date(x) for x in dates) if d is not None]
+        if not valid:
+            return []
+        ends, target = [], valid[-1]
+        while target >= valid[0]:
+            end = bisect.bisect_right(dates, target.isoformat())
+            if end and (not ends or end != ends[-1]):
+                ends.append(end)
+            target -= timedelta(days=step_size)
+    ends.reverse()
+
+    first_date = _parse_date(dates[0])
+
+    def is_full(end):
+        if unit == 'draws':
+            return end >= span
+        end_date = _parse_date(dates[end - 1])
+        return first_date is not None and end_date is not None and first_date <= end_date - timedelta(days=span - 1)
+
+    return [end for end in ends if end == n or is_full(end)]
+
+
+def _window_start(dates, window, end):
+    span, unit = window
+    if unit == 'draws':
+        return max(0, end - span)
+    end_date = _parse_date(dates[end - 1])
+    if end_date is None:
+        return end - 1
+    return bisect.bisect_left(dates, (end_date - timedelta(days=span - 1)).isoformat(), 0, end)
+
+
+def rolling_analysis(partition, analysis, window, step=None, max_points=MAX_POINTS):
+    """
+    Series of an analysis over sliding windows of a partition.
+    `window` and `step` are parsed spans (see parse_span); without a step,
+    about DEFAULT_POINTS evenly spaced windows are returned.
+    Each point holds start/end dates, its draw count and the same keys as
+    the comprehensive payload (frequency_chart, hot_cold, gaps...).
+    Raises ValueError if the series would exceed max_points.
+    """
+    draws, dates = partition.draws, partition.dates
+    max_num = MAX_NUMBERS.get(partition.game_type, 39)
+    keys = ANALYSIS_VIEWS[analysis]
+    with_super = partition.game_type == 'baloto'
+
+    if step is None:
+        step = (max(1, math.ceil(len(draws) / DEFAULT_POINTS)), 'draws')
+    ends = _window_ends(dates, window, step) if draws else []
+    if len(ends) > max_points:
+        raise ValueError(f'The series would have {len(ends)} points (max {max_points}); use a larger step')
+
+    counters = WindowCounters(pairs='pairs' in keys)
+    first_half = WindowCounters(detail=False)
+    second_half = WindowCounters(detail=False)
+    track_halves = 'trends' in keys
+
+    # Latest index at which each number / super ball was drawn
+    last_index = {}
+    super_last_index = {}
+
+    lo = hi = mid = 0
+    series = []
+    for end in ends:
+        start = _window_start(dates, window, end)
+
+        while hi < end:
+            draw = draws[hi]
+            counters.add(draw)
+            if track_halves:
+                second_half.add(draw)
+            for num in draw['numbers']:
+                last_index[num] = hi
+            if draw.get('super') is not None:
+                super_last_index[draw['super']] = hi
+            hi += 1
+
+        if track_halves:
+            # First half: the first size // 2 draws of the window
+            new_mid = (start + end) // 2
+            while mid < new_mid:
+                second_half.remove(draws[mid])
+                first_half.add(draws[mid])
+                mid += 1
+
+        while lo < start:
+            counters.remove(draws[lo])
+            if track_halves:
+                first_half.remove(draws[lo])
+            lo += 1
+
+        point = {'start': dates[start], 'end': dates[end - 1], 'draws': end - start}
+        for key in keys:
+            if key == 'super_analysis' and not with_super:
+                point[key] = None
+                continue
+            point[key] = _view(key, counters, first_half, second_half, dates, start, end, max_num,
+                               last_index, super_last_index)
+        series.append(point)
+
+    return {
+        'window': f"{window[0]}{'d' if window[1] == 'days' else ''}",
+        'step': f"{step[0]}{'d' if step[1] == 'days' else ''}",
+        'series': series,
+    }
+
+
+def _draws_since(dates, index, start, end):
+    """
+    Draws of the window [start, end) strictly newer than the draw at index.
+    """
+    return end - bisect.bisect_right(dates, dates[index], start, end)
+
+
+def _view(key, counters, first_half, second_half, dates, start, end, max_num, last_index, super_last_index):
+    size = end - start
+
+    if key == 'frequency_chart':
+        return {'numbers': dict(counters.number_freq), 'super': dict(counters.super_freq)}
+
+    if key == 'hot_cold':
+        return logic.classify_hot_cold(counters.number_freq, size, max_num)
+
+    if key == 'gaps':
+        result = []
+        for num in range(1, max_num + 1):
+            idx = last_index.get(num)
+            if idx is None or idx < start:
+                result.append({'number': num, 'gap': size, 'last_seen': None})
+            else:
+                result.append({'number': num, 'gap': _draws_since(dates, idx, start, end), 'last_seen': dates[idx]})
+        result.sort(key=lambda x: x['gap'], reverse=True)
+        return result
+
+    if key == 'pairs':
+        top_pairs = heapq.nsmallest(20, counters.pair_freq.items(), key=lambda item: (-item[1], item[0]))
+        return [{'pair': list(pair), 'frequency': freq} for pair, freq in top_pairs]
+
+    if key == 'sum_distribution':
+        return logic.summarize_sum_counts(counters.sum_freq)
+
+    if key == 'trends':
+        if size < 5:
+            return {'trending_up': [], 'trending_down': [], 'stable': []}
+        return logic.classify_trends(first_half.number_freq, second_half.number_freq,
+                                     first_half.size, second_half.size, max_num)
+
+    if key == 'position_analysis':
+        return logic.summarize_positions([_by_key(counter) for counter in counters.position_freq])
+
+    if key == 'super_analysis':
+        last_seen = {num: _draws_since(dates, idx, start, end)
+                     for num, idx in super_last_index.items() if idx >= start}
+        return logic.summarize_super(_by_key(counters.super_freq), last_seen, size)
+
+    raise KeyError(key)
@@ -1,13 +1,24 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from urllib.parse import urlparse
 import random
 import re
+import threading
+
+from metrics import timed
 
 # Target URLs
 BALOTO_URL = "https://baloto.com/resultados"
 MILOTO_URL = "https://baloto.com/miloto/resultados/"
 
+# Paginated result archives, used by the historical backfill
+BALOTO_HISTORY_URL = "https://baloto.com/resultados?page={page}"
+MILOTO_HISTORY_URL = "https://baloto.com/miloto/resultados/?page={page}"
+
 # Headers to mimic a browser request
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -16,27 +27,121 @@ HEADERS = {
     'Connection': 'keep-alive',
 }
 
+REQUEST_TIMEOUT = 15
+
+# At most this many requests in flight per host
+PER_HOST_CONCURRENCY = 2
+
+# Retries for connection errors and transient HTTP statuses, with exponential backoff
+RETRY_POLICY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=['GET'],
+)
+
+# Compiled once at import instead of on every call
+SPANISH_MONTHS = {
+    'enero': '01', 'febrero': '02', 'marzo': '03', 'abril': '04',
+    'mayo': '05', 'junio': '06', 'julio': '07', 'agosto': '08',
+    'septiembre': '09', 'octubre': '10', 'noviembre': '11', 'diciembre': '12'
+}
+DATE_PATTERN = re.compile(r'(\d{1,2})\s+de\s+(\w+)\s+de\s+(\d{4})')
+DATE_TEXT_PATTERN = re.compile(r'\d{1,2}\s+de\s+\w+\s+de\s+\d{4}', re.I)
+NUMBER_PATTERN = re.compile(r'\d+')
+BALOTO_NUMBERS_PATTERN = re.compile(r'(\d{2}\s*-\s*\d{2}\s*-\s*\d{2}\s*-\s*\d{2}\s*-\s*\d{2}(?:\s*-\s*\d{1,2})?)')
+MILOTO_NUMBERS_PATTERN = re.compile(r'(\d{2}\s*-\s*\d{2}\s*-\s*\d{2}\s*-\s*\d{2}\s*-\s*\d{2})')
+RESULT_CLASS_PATTERN = re.compile(r'result|histor', re.I)
+
+# lxml builds the tree in C and is much faster; it is optional
+try:
+    import lxml.html as lxml_html
+except ImportError:
+    lxml_html = None
+
+# Without lxml, only result rows and result containers are built into the
+# BeautifulSoup tree; <head>, scripts and other markup are skipped
+RESULT_STRAINER = SoupStrainer(['tr', 'div', 'section'])
+
+
+
+class ScrapeError(Exception):
+    """
+    Raised when a results page cannot be fetched or yields no results.
+    Simulated draws are never returned in their place: whatever the scrapers
+    return is written through to the on-disk history.
+    """
+
+
+_session = None
+_session_lock = threading.Lock()
+_host_limits = {}
+
+
+def get_session():
+    """
+    Shared keep-alive session with pooled connections and retries.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=PER_HOST_CONCURRENCY * 2,
+                                  max_retries=RETRY_POLICY)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+        return _session
+
+
+def _host_limit(url):
+    host = urlparse(url).netloc
+    with _session_lock:
+        if host not in _host_limits:
+            _host_limits[host] = threading.BoundedSemaphore(PER_HOST_CONCURRENCY)
+        return _host_limits[host]
+
+
+def fetch_page(url, timeout=REQUEST_TIMEOUT):
+    """
+    Downloads a page through the shared session, honouring the per-host limit.
+    """
+    with _host_limit(url), timed('scraper.fetch'):
+        response = get_session().get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.text
+
+
+def fetch_pages(urls, max_workers=8):
+    """
+    Downloads several pages concurrently.
+    Returns {url: html or the exception raised while fetching it}.
+    """
+    def fetch(url):
+        try:
+            return fetch_page(url)
+        except requests.RequestException as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(urls, executor.map(fetch, urls)))
+
 def parse_spanish_date(date_str):
     """
     Parses Spanish date format like '19 de Enero de 2026' to 'YYYY-MM-DD'
     """
-    months = {
-        'enero': '01', 'febrero': '02', 'marzo': '03', 'abril': '04',
-        'mayo': '05', 'junio': '06', 'julio': '07', 'agosto': '08',
-        'septiembre': '09', 'octubre': '10', 'noviembre': '11', 'diciembre': '12'
-    }
-    
     try:
         # Clean the date string
         date_str = date_str.lower().strip()
         
         # Extract day, month, year using regex
-        match = re.search(r'(\d{1,2})\s+de\s+(\w+)\s+de\s+(\d{4})', date_str)
+        match = DATE_PATTERN.search(date_str)
         if match:
             day = match.group(1).zfill(2)
             month_name = match.group(2)
             year = match.group(3)
-            month = months.get(month_name, '01')
+            month = SPANISH_MONTHS.get(month_name, '01')
             return f"{year}-{month}-{day}"
     except Exception as e:
         print(f"Error parsing date '{date_str}': {e}")
@@ -49,8 +154,7 @@ def parse_numbers_from_text(text):
     Returns (main_numbers, super_balota) where super_balota may be None
     """
     # Find all numbers in the text
-    numbers = re.findall(r'\d+', text)
-    numbers = [int(n) for n in numbers]
+    numbers = [int(n) for n in NUMBER_PATTERN.findall(text)]
     
     if len(numbers) >= 6:
         # Baloto format: 5 main numbers + 1 super balota
@@ -72,182 +176,223 @@ def is_within_last_2_months(date_str):
     except:
         return True  # Include if we can't parse
 
-def get_baloto_results():
+def _is_result_node(tag):
+    if tag.name == 'tr':
+        return True
+    if tag.name in ('div', 'section'):
+        return any(RESULT_CLASS_PATTERN.search(cls) for cls in tag.get('class') or [])
+    return False
+
+def _stripped_text(element):
+    # Same as BeautifulSoup's get_text(strip=True)
+    return ''.join(text.strip() for text in element.itertext())
+
+def iter_result_nodes(html):
+    """
+    Walks the page once, in document order, and yields
+    ('row', [cell texts]) for table rows and ('block', text) for
+    result/history containers.
+    """
+    if not html.strip():
+        return
+    
+    if lxml_html is not None:
+        try:
+            root = lxml_html.fromstring(html)
+        except ValueError:
+            root = lxml_html.fromstring(html.encode('utf-8'))
+        for element in root.iter('tr', 'div', 'section'):
+            if element.tag == 'tr':
+                yield 'row', [_stripped_text(td) for td in element.iter('td')]
+            elif RESULT_CLASS_PATTERN.search(element.get('class') or ''):
+                yield 'block', element.text_content()
+        return
+    
+    soup = BeautifulSoup(html, 'html.parser', parse_only=RESULT_STRAINER)
+    for node in soup.find_all(_is_result_node):
+        if node.name == 'tr':
+            yield 'row', [td.get_text(strip=True) for td in node.find_all('td')]
+        else:
+            yield 'block', node.get_text()
+
+def _results_from_text(text, numbers_pattern, recent_only):
+    """
+    Pairs dates and number sequences found in the text of a result container.
+    Yields (date_str, main_numbers, super_balota).
+    """
+    date_matches = DATE_TEXT_PATTERN.findall(text)
+    number_matches = numbers_pattern.findall(text)
+    
+    for date_match, num_match in zip(date_matches, number_matches):
+        date_str = parse_spanish_date(date_match)
+        if not recent_only or is_within_last_2_months(date_str):
+            main_numbers, super_balota = parse_numbers_from_text(num_match)
+            if len(main_numbers) >= 5:
+                yield date_str, main_numbers, super_balota
+
+@timed('scraper.parse_baloto')
+def parse_baloto_results(html, recent_only=True):
+    """
+    Extracts the Baloto and Revancha results from a results page.
+    Only the last 2 months are kept unless recent_only is False.
+    """
+    results = []
+    
+    # Table rows hold SORTEO, FECHA, RESULTADO columns; div-based layouts
+    # are scanned for date and number patterns instead
+    for kind, content in iter_result_nodes(html):
+        if kind == 'block':
+            for date_str, main_numbers, super_balota in _results_from_text(content, BALOTO_NUMBERS_PATTERN, recent_only):
+                results.append({
+                    'date': date_str,
+                    'type': 'baloto',
+                    'numbers': sorted(main_numbers[:5]),
+                    'super': super_balota
+                })
+            continue
+        
+        try:
+            cells = content
+            if len(cells) >= 3:
+                # Check if this is a Baloto or Revancha row
+                sorteo_cell = cells[0].lower()
+                
+                # Get the date
+                date_str = parse_spanish_date(cells[1])
+                
+                # Skip if older than 2 months
+                if recent_only and not is_within_last_2_months(date_str):
+                    continue
+                
+                # Get the numbers
+                main_numbers, super_balota = parse_numbers_from_text(cells[2])
+                
+                if len(main_numbers) >= 5:
+                    result_type = 'baloto'
+                    if 'revancha' in sorteo_cell:
+                        result_type = 'revancha'
+                    
+                    results.append({
+                        'date': date_str,
+                        'type': result_type,
+                        'numbers': sorted(main_numbers[:5]),
+                        'super': super_balota
+                    })
+        except Exception as e:
+            continue
+    
+    # Remove duplicates based on date and type
+    return _unique_results(results, lambda r: (r['date'], r['type'], tuple(r['numbers'])))
+
+def get_baloto_results(url=BALOTO_URL):
     """
     Scrapes the last 2 months of Baloto results from baloto.com/resultados
     Returns a list of dicts: {'date': str, 'type': 'baloto', 'numbers': [int], 'super': int}
+    Raises ScrapeError if the page cannot be fetched or parsed.
     """
-    results = []
     print("Fetching Baloto data from baloto.com/resultados...")
     
     try:
-        response = requests.get(BALOTO_URL, headers=HEADERS, timeout=15)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find the historical results table
-        # Looking for rows in the results table
-        # The structure observed: table rows with SORTEO, FECHA, RESULTADO columns
-        
-        # Try to find result rows - they typically contain Baloto logo and numbers
-        rows = soup.find_all('tr')
-        
-        for row in rows:
-            try:
-                cells = row.find_all('td')
-                if len(cells) >= 3:
-                    # Check if this is a Baloto or Revancha row
-                    sorteo_cell = cells[0].get_text(strip=True).lower()
-                    
-                    # Get the date
-                    date_text = cells[1].get_text(strip=True)
-                    date_str = parse_spanish_date(date_text)
-                    
-                    # Skip if older than 2 months
-                    if not is_within_last_2_months(date_str):
-                        continue
-                    
-                    # Get the numbers
-                    result_text = cells[2].get_text(strip=True)
-                    main_numbers, super_balota = parse_numbers_from_text(result_text)
-                    
-                    if len(main_numbers) >= 5:
-                        result_type = 'baloto'
-                        if 'revancha' in sorteo_cell:
-                            result_type = 'revancha'
-                        
-                        results.append({
-                            'date': date_str,
-                            'type': result_type,
-                            'numbers': sorted(main_numbers[:5]),
-                            'super': super_balota
-                        })
-            except Exception as e:
-                continue
-        
-        # Also try to find results in div-based layouts
-        result_divs = soup.find_all(['div', 'section'], class_=re.compile(r'result|histor', re.I))
-        for div in result_divs:
-            # Look for date and number patterns
-            text = div.get_text()
-            date_matches = re.findall(r'\d{1,2}\s+de\s+\w+\s+de\s+\d{4}', text, re.I)
-            number_matches = re.findall(r'(\d{2}\s*-\s*\d{2}\s*-\s*\d{2}\s*-\s*\d{2}\s*-\s*\d{2}(?:\s*-\s*\d{1,2})?)', text)
-            
-            for date_match, num_match in zip(date_matches, number_matches):
-                date_str = parse_spanish_date(date_match)
-                if is_within_last_2_months(date_str):
-                    main_numbers, super_balota = parse_numbers_from_text(num_match)
-                    if len(main_numbers) >= 5:
-                        results.append({
-                            'date': date_str,
-                            'type': 'baloto',
-                            'numbers': sorted(main_numbers[:5]),
-                            'super': super_balota
-                        })
-        
-        if results:
-            print(f"Successfully fetched {len(results)} Baloto results from the website")
-            # Remove duplicates based on date and type
-            seen = set()
-            unique_results = []
-            for r in results:
-                key = (r['date'], r['type'], tuple(r['numbers']))
-                if key not in seen:
-                    seen.add(key)
-                    unique_results.append(r)
-            return unique_results
-            
+        results = parse_baloto_results(fetch_page(url))
     except requests.RequestException as e:
-        print(f"Error fetching Baloto data: {e}")
+        raise ScrapeError(f"Error fetching Baloto data: {e}") from e
     except Exception as e:
-        print(f"Error parsing Baloto data: {e}")
+        raise ScrapeError(f"Error parsing Baloto data: {e}") from e
+    
+    if not results:
+        raise ScrapeError("No Baloto results found on the page (blocked or layout changed)")
+    print(f"Successfully fetched {len(results)} Baloto results from the website")
+    return results
+
+@timed('scraper.parse_miloto')
+def parse_miloto_results(html, recent_only=True):
+    """
+    Extracts the MiLoto results from a results page.
+    Only the last 2 months are kept unless recent_only is False.
+    """
+    results = []
+    
+    # Table rows hold FECHA, RESULTADO columns; div-based layouts are
+    # scanned for date and number patterns instead
+    for kind, content in iter_result_nodes(html):
+        if kind == 'block':
+            for date_str, main_numbers, _ in _results_from_text(content, MILOTO_NUMBERS_PATTERN, recent_only):
+                results.append({
+                    'date': date_str,
+                    'type': 'miloto',
+                    'numbers': sorted(main_numbers[:5])
+                })
+            continue
+        
+        try:
+            cells = content
+            if len(cells) >= 2:
+                # Get the date
+                date_str = parse_spanish_date(cells[0])
+                
+                # Skip if older than 2 months
+                if recent_only and not is_within_last_2_months(date_str):
+                    continue
+                
+                # Get the numbers (MiLoto has no super balota)
+                main_numbers, _ = parse_numbers_from_text(cells[1])
+                
+                if len(main_numbers) >= 5:
+                    results.append({
+                        'date': date_str,
+                        'type': 'miloto',
+                        'numbers': sorted(main_numbers[:5])
+                    })
+        except Exception as e:
+            continue
     
-    # Fallback to simulated data if scraping fails
-    print("Using simulated Baloto data (scraping failed or blocked)")
-    return generate_simulated_baloto_results()
+    # Remove duplicates
+    return _unique_results(results, lambda r: (r['date'], tuple(r['numbers'])))
 
-def get_miloto_results():
+def get_miloto_results(url=MILOTO_URL):
     """
     Scrapes the last 2 months of MiLoto results from baloto.com/miloto/resultados/
     Returns a list of dicts: {'date': str, 'type': 'miloto', 'numbers': [int]}
+    Raises ScrapeError if the page cannot be fetched or parsed.
     """
-    results = []
     print("Fetching MiLoto data from baloto.com/miloto/resultados/...")
     
     try:
-        response = requests.get(MILOTO_URL, headers=HEADERS, timeout=15)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find the historical results table
-        # MiLoto structure: FECHA, RESULTADO columns
-        rows = soup.find_all('tr')
-        
-        for row in rows:
-            try:
-                cells = row.find_all('td')
-                if len(cells) >= 2:
-                    # Get the date
-                    date_text = cells[0].get_text(strip=True)
-                    date_str = parse_spanish_date(date_text)
-                    
-                    # Skip if older than 2 months
-                    if not is_within_last_2_months(date_str):
-                        continue
-                    
-                    # Get the numbers (MiLoto has no super balota)
-                    result_text = cells[1].get_text(strip=True)
-                    main_numbers, _ = parse_numbers_from_text(result_text)
-                    
-                    if len(main_numbers) >= 5:
-                        results.append({
-                            'date': date_str,
-                            'type': 'miloto',
-                            'numbers': sorted(main_numbers[:5])
-                        })
-            except Exception as e:
-                continue
-        
-        # Also try to find results in div-based layouts
-        result_divs = soup.find_all(['div', 'section'], class_=re.compile(r'result|histor', re.I))
-        for div in result_divs:
-            text = div.get_text()
-            date_matches = re.findall(r'\d{1,2}\s+de\s+\w+\s+de\s+\d{4}', text, re.I)
-            number_matches = re.findall(r'(\d{2}\s*-\s*\d{2}\s*-\s*\d{2}\s*-\s*\d{2}\s*-\s*\d{2})', text)
-            
-            for date_match, num_match in zip(date_matches, number_matches):
-                date_str = parse_spanish_date(date_match)
-                if is_within_last_2_months(date_str):
-                    main_numbers, _ = parse_numbers_from_text(num_match)
-                    if len(main_numbers) >= 5:
-                        results.append({
-                            'date': date_str,
-                            'type': 'miloto',
-                            'numbers': sorted(main_numbers[:5])
-                        })
-        
-        if results:
-            print(f"Successfully fetched {len(results)} MiLoto results from the website")
-            # Remove duplicates
-            seen = set()
-            unique_results = []
-            for r in results:
-                key = (r['date'], tuple(r['numbers']))
-                if key not in seen:
-                    seen.add(key)
-                    unique_results.append(r)
-            return unique_results
-            
+        results = parse_miloto_results(fetch_page(url))
     except requests.RequestException as e:
-        print(f"Error fetching MiLoto data: {e}")
+        raise ScrapeError(f"Error fetching MiLoto data: {e}") from e
     except Exception as e:
-        print(f"Error parsing MiLoto data: {e}")
+        raise ScrapeError(f"Error parsing MiLoto data: {e}") from e
     
-    # Fallback to simulated data if scraping fails
-    print("Using simulated MiLoto data (scraping failed or blocked)")
-    return generate_simulated_miloto_results()
+    if not results:
+        raise ScrapeError("No MiLoto results found on the page (blocked or layout changed)")
+    print(f"Successfully fetched {len(results)} MiLoto results from the website")
+    return results
+
+def get_all_results():
+    """
+    Fetches Baloto and MiLoto concurrently, so the total time is bounded by
+    the slowest source instead of the sum of both.
+    Returns (baloto_results, miloto_results). Raises ScrapeError, naming
+    every source that failed, if either of them does.
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(get_baloto_results), executor.submit(get_miloto_results)]
+        errors = [future.exception() for future in futures]
+    failed = [str(e) for e in errors if e is not None]
+    if failed:
+        raise ScrapeError('; '.join(failed)) from next(e for e in errors if e is not None)
+    return futures[0].result(), futures[1].result()
+
+def _unique_results(results, key):
+    seen = set()
+    unique_results = []
+    for r in results:
+        k = key(r)
+        if k not in seen:
+            seen.add(k)
+            unique_results.append(r)
+    return unique_results
 
 def generate_dates_last_2_months(draws_per_week=2):
     """
@@ -268,45 +413,69 @@ def generate_dates_last_2_months(draws_per_week=2):
     
     return dates
 
-def generate_simulated_baloto_results():
+def generate_dates_for_draws(num_draws, draws_per_week=2):
     """
-    Generates simulated Baloto results for the last 2 months.
-    Used as fallback when scraping fails.
+    Generates num_draws draw dates going back from today (most recent first).
+    Histories longer than a few centuries reuse dates, several draws per day.
+    """
+    today = datetime.now()
+    days_between_draws = 7 // draws_per_week
+    max_days = 365 * 200
+    span = min(num_draws * days_between_draws, max_days)
+    
+    return [(today - timedelta(days=i * span // max(1, num_draws))).strftime("%Y-%m-%d")
+            for i in range(num_draws)]
+
+def generate_simulated_baloto_results(num_draws=None, include_revancha=True, rng=random):
+    """
+    Generates simulated Baloto results for the last 2 months, for demos and
+    benchmarks; they must never be added to the persisted store.
+    With num_draws, generates that many draw dates instead (synthetic
+    histories for benchmarks); rng allows seeded, reproducible output.
     """
     results = []
-    dates = generate_dates_last_2_months(draws_per_week=2)
+    if num_draws is None:
+        dates = generate_dates_last_2_months(draws_per_week=2)
+    else:
+        dates = generate_dates_for_draws(num_draws, draws_per_week=2)
     
     for date in dates:
         # Baloto draw
         results.append({
             'date': date,
             'type': 'baloto',
-            'numbers': sorted(random.sample(range(1, 44), 5)),
-            'super': random.randint(1, 16)
-        })
-        # Revancha draw (same date)
-        results.append({
-            'date': date,
-            'type': 'revancha',
-            'numbers': sorted(random.sample(range(1, 44), 5)),
-            'super': random.randint(1, 16)
+            'numbers': sorted(rng.sample(range(1, 44), 5)),
+            'super': rng.randint(1, 16)
         })
+        if include_revancha:
+            # Revancha draw (same date)
+            results.append({
+                'date': date,
+                'type': 'revancha',
+                'numbers': sorted(rng.sample(range(1, 44), 5)),
+                'super': rng.randint(1, 16)
+            })
     
     return results
 
-def generate_simulated_miloto_results():
+def generate_simulated_miloto_results(num_draws=None, rng=random):
     """
-    Generates simulated MiLoto results for the last 2 months.
-    Used as fallback when scraping fails.
+    Generates simulated MiLoto results for the last 2 months, for demos and
+    benchmarks; they must never be added to the persisted store.
+    With num_draws, generates that many draws instead (synthetic histories
+    for benchmarks); rng allows seeded, reproducible output.
     """
     results = []
-    dates = generate_dates_last_2_months(draws_per_week=4)
+    if num_draws is None:
+        dates = generate_dates_last_2_months(draws_per_week=4)
+    else:
+        dates = generate_dates_for_draws(num_draws, draws_per_week=4)
     
     for date in dates:
         results.append({
             'date': date,
             'type': 'miloto',
-            'numbers': sorted(random.sample(range(1, 40), 5))
+            'numbers': sorted(rng.sample(range(1, 40), 5))
         })
     
     return results
@@ -18,6 +18,10 @@ document.addEventListener('DOMContentLoaded', () => {
     // Current selected game for predictive tab
     let currentGame = 'baloto';
 
+    // Last payloads rendered, updated in place by server-sent events
+    let predictiveData = null;
+    let historyData = null;
+
     // ============================================
     // TAB NAVIGATION
     // ============================================
@@ -82,9 +86,10 @@ document.addEventListener('DOMContentLoaded', () => {
         try {
             const response = await fetch('/api/fetch-results', { method: 'POST' });
             const data = await response.json();
+            const job = response.status === 202 ? await waitForJob(data.job_id) : data;
 
-            if (data.status === 'success') {
-                statusMsg.textContent = `¡Listo! ${data.message} Total: ${data.count} registros.`;
+            if (job.status === 'done') {
+                statusMsg.textContent = `¡Listo! ${job.message} Total: ${job.count} registros.`;
                 statusMsg.style.color = '#4ade80';
                 
                 // Refresh predictive data if on that tab
@@ -93,7 +98,7 @@ document.addEventListener('DOMContentLoaded', () => {
                     loadPredictiveData(currentGame);
                 }
             } else {
-                statusMsg.textContent = 'Error: ' + data.message;
+                statusMsg.textContent = 'Error: ' + job.message;
                 statusMsg.style.color = '#ef4444';
             }
         } catch (error) {
@@ -104,6 +109,21 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
+    // Polls a background refresh job until it finishes
+    async function waitForJob(jobId) {
+        while (true) {
+            const response = await fetch(`/api/jobs/${jobId}`);
+            const data = await response.json();
+            if (data.status !== 'success') {
+                return { status: 'error', message: data.message };
+            }
+            if (data.job.status === 'done' || data.job.status === 'error') {
+                return data.job;
+            }
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
+    }
+
     // ============================================
     // GENERATE PREDICTION
     // ============================================
@@ -113,7 +133,8 @@ document.addEventListener('DOMContentLoaded', () => {
         const container = type === 'baloto' ? document.getElementById('balotoResult') : document.getElementById('milotoResult');
 
         try {
-            const response = await fetch(`/api/generate-${type}`);
+            const strategy = document.getElementById('strategySelect').value;
+            const response = await fetch(`/api/generate-${type}?strategy=${encodeURIComponent(strategy)}`);
             const data = await response.json();
 
             if (data.status === 'success') {
@@ -209,6 +230,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
             if (result.status === 'success') {
                 const data = result.data;
+                predictiveData = { game: gameType, data: data };
                 
                 renderFrequencyChart(data.frequency_chart, gameType);
                 renderHotColdNumbers(data.hot_cold);
@@ -728,6 +750,7 @@ document.addEventListener('DOMContentLoaded', () => {
             const result = await response.json();
             
             if (result.status === 'success') {
+                historyData = { game: gameType, data: result.data };
                 renderHistory(result.data, gameType);
                 statusMsg.textContent = `Historial cargado: ${result.count} sorteos`;
                 statusMsg.style.color = '#4ade80';
@@ -777,4 +800,78 @@ document.addEventListener('DOMContentLoaded', () => {
         tableHtml += '</tbody></table>';
         container.innerHTML = tableHtml;
     }
+
+    // ============================================
+    // LIVE UPDATES (Server-Sent Events)
+    // ============================================
+    if (window.EventSource) {
+        const events = new EventSource('/api/events');
+
+        events.addEventListener('draws', (e) => {
+            const update = JSON.parse(e.data);
+            statusMsg.textContent = `${update.added} sorteo(s) nuevo(s) de ${update.game}.`;
+            statusMsg.style.color = '#4ade80';
+
+            if (!historyData || historyData.game !== update.game) {
+                return;
+            }
+            if (!update.draws) {
+                // Too many draws to push; reload the table
+                loadHistoryBtn.click();
+                return;
+            }
+            historyData.data = update.draws.concat(historyData.data)
+                .sort((a, b) => (b.date || '').localeCompare(a.date || ''));
+            renderHistory(historyData.data, update.game);
+        });
+
+        events.addEventListener('analytics', (e) => {
+            const delta = JSON.parse(e.data);
+            if (!predictiveData || predictiveData.game !== delta.game) {
+                return;
+            }
+            applyAnalyticsDelta(predictiveData.data, delta);
+
+            const predictiveTab = document.getElementById('tab-predictive');
+            if (predictiveTab.classList.contains('active')) {
+                renderFrequencyChart(predictiveData.data.frequency_chart, delta.game);
+                renderHotColdNumbers(predictiveData.data.hot_cold);
+                renderGapsChart(predictiveData.data.gaps);
+            }
+        });
+
+        events.addEventListener('reset', () => {
+            // Missed updates: fall back to full reloads
+            predictiveData = null;
+            const predictiveTab = document.getElementById('tab-predictive');
+            if (predictiveTab.classList.contains('active')) {
+                loadPredictiveData(currentGame);
+            }
+            if (historyData) {
+                loadHistoryBtn.click();
+            }
+        });
+    }
+
+    function applyAnalyticsDelta(data, delta) {
+        const freq = data.frequency_chart;
+        if (delta.full) {
+            freq.numbers = {};
+            freq.super = {};
+        }
+        Object.assign(freq.numbers, delta.frequency_chart.numbers);
+        Object.assign(freq.super, delta.frequency_chart.super);
+
+        if (delta.hot_cold) {
+            data.hot_cold = delta.hot_cold;
+        }
+
+        const gaps = {};
+        data.gaps.forEach(g => { gaps[g.number] = g; });
+        Object.entries(delta.gaps).forEach(([number, [gap, lastSeen]]) => {
+            gaps[number] = { number: Number(number), gap: gap, last_seen: lastSeen };
+        });
+        data.gaps = Object.values(gaps).sort((a, b) => b.gap - a.gap);
+        data.total_draws = delta.total_draws;
+    }
 });
@@ -0,0 +1,359 @@
+"""
+Draw store for SW BALOTO.
+Keeps draws partitioned by game type and sorted by date, with a hash index
+on (date, type, numbers) for constant-time duplicate detection.
+
+Partitions are copy-on-write: a writer inserts into private copies of the
+partitions it touches and then swaps them in with a single assignment, so
+readers never take a lock and never see a half-applied write. A reader that
+holds on to a partition keeps a consistent snapshot of that game.
+"""
+import bisect
+from datetime import date
+import hashlib
+import threading
+
+from analytics import GameAnalytics, MAX_NUMBERS
+
+
+# Batches larger than this are inserted with one analytics rebuild instead of per draw
+BULK_INSERT = 256
+
+PICKS = 5
+
+# Highest super ball number
+MAX_SUPER = 16
+
+
+def draw_key(draw):
+    """
+    Returns the identity key of a draw: (date, type, sorted numbers).
+    """
+    return (draw.get('date', ''), draw['type'], tuple(sorted(draw['numbers'])))
+
+
+def validate_draw(draw):
+    """
+    Checks that a draw can be stored: a known game type, five distinct
+    numbers within its pool, a super ball in 1..MAX_SUPER or none, and a
+    'YYYY-MM-DD' date. Raises ValueError describing the first problem.
+    """
+    game_type = draw.get('type')
+    if game_type not in MAX_NUMBERS:
+        raise ValueError(f'type must be one of {", ".join(MAX_NUMBERS)}')
+
+    pool = MAX_NUMBERS[game_type]
+    numbers = draw.get('numbers')
+    # type() rather than isinstance: True is an int, but not a ball number
+    if (not isinstance(numbers, (list, tuple)) or len(numbers) != PICKS or len(set(numbers)) != PICKS
+            or any(type(n) is not int for n in numbers) or min(numbers) < 1 or max(numbers) > pool):
+        raise ValueError(f'numbers must be {PICKS} distinct integers between 1 and {pool}')
+
+    super_num = draw.get('super')
+    if super_num is not None and not (type(super_num) is int and 1 <= super_num <= MAX_SUPER):
+        raise ValueError(f'super must be an integer between 1 and {MAX_SUPER}')
+
+    try:
+        # Dates are compared as strings, so only the extended form is accepted
+        valid_date = date.fromisoformat(draw.get('date')).isoformat() == draw['date']
+    except (TypeError, ValueError):
+        valid_date = False
+    if not valid_date:
+        raise ValueError('date must be YYYY-MM-DD')
+
+
+def _key_hash(key):
+    # Stable across processes, unlike hash()
+    return int.from_bytes(hashlib.blake2b(repr(key).encode(), digest_size=8).digest(), 'big')
+
+
+class GamePartition:
+    """
+    Draws of a single game type, kept sorted by date (oldest first).
+    Draws that share a date keep their insertion order.
+    """
+
+    def __init__(self, game_type):
+        self.game_type = game_type
+        self.draws = []
+        self.dates = []  # Parallel list of dates, used for bisect lookups
+        self.version = 0  # Bumped on every insertion
+        # Order-independent hash of the stored draws; equal in every process
+        # holding the same draws, unlike the version counter
+        self.checksum = 0
+        self.analytics = GameAnalytics(self)
+
+    def __len__(self):
+        return len(self.draws)
+
+    def copy(self, with_analytics=True):
+        """
+        Private copy for a writer. Without analytics, the copy starts with
+        empty accumulators and must be filled with insert_many.
+        """
+        clone = GamePartition(self.game_type)
+        clone.draws = list(self.draws)
+        clone.dates = list(self.dates)
+        clone.version = self.version
+        clone.checksum = self.checksum
+        if with_analytics:
+            clone.analytics = self.analytics.copy(clone)
+        return clone
+
+    def insert(self, draw):
+        date = draw.get('date', '')
+        idx = bisect.bisect_right(self.dates, date)
+        self.dates.insert(idx, date)
+        self.draws.insert(idx, draw)
+        self.analytics.add(draw, idx)
+        self.version += 1
+        self.checksum = (self.checksum + _key_hash(draw_key(draw))) % 2 ** 64
+        return idx
+
+    def insert_many(self, draws):
+        """
+        Inserts several draws and rebuilds the analytics once at the end.
+        """
+        if not draws:
+            return
+        for draw in draws:
+            date = draw.get('date', '')
+            if not self.dates or date >= self.dates[-1]:
+                self.dates.append(date)
+                self.draws.append(draw)
+            else:
+                idx = bisect.bisect_right(self.dates, date)
+                self.dates.insert(idx, date)
+                self.draws.insert(idx, draw)
+            self.checksum = (self.checksum + _key_hash(draw_key(draw))) % 2 ** 64
+        self.analytics.rebuild()
+        self.version += 1
+
+    def bounds(self, start=None, end=None):
+        """
+        Returns the index range [lo, hi) of the draws dated within [start, end].
+        Either bound may be None to leave that side open.
+        """
+        lo = bisect.bisect_left(self.dates, start) if start else 0
+        hi = bisect.bisect_right(self.dates, end) if end else len(self.dates)
+        return lo, hi
+
+    def date_range(self, start=None, end=None):
+        """
+        Returns the draws whose date is within [start, end] (both inclusive).
+        """
+        lo, hi = self.bounds(start, end)
+        return self.draws[lo:hi]
+
+    def cursor(self, idx):
+        """
+        Stable position of the draw at idx: its date and its rank among the
+        draws of that date. Later insertions do not move it.
+        """
+        date = self.dates[idx]
+        return f'{date}:{idx - bisect.bisect_left(self.dates, date)}'
+
+    def cursor_index(self, cursor):
+        """
+        Index of the draw a cursor points to. Raises ValueError if it is
+        malformed or its rank is not that of a draw of its date.
+        """
+        date, rank = cursor.rsplit(':', 1)
+        lo, hi = self.bounds(date, date)
+        rank = int(rank)
+        if not 0 <= rank < hi - lo:
+            raise ValueError(f'No draw at {cursor}')
+        return lo + rank
+
+    def page(self, start=None, end=None, offset=0, limit=None, cursor=None):
+        """
+        Newest-first page of the draws dated within [start, end].
+        With a cursor, the page starts right after (older than) that draw.
+        Costs O(limit): draws are already sorted, only the page is copied.
+        Returns {'draws': [...], 'total': int, 'next_cursor': str|None}.
+        """
+        lo, hi = self.bounds(start, end)
+        total = max(hi - lo, 0)
+        if cursor is not None:
+            hi = min(hi, self.cursor_index(cursor))
+
+        stop = hi - offset
+        begin = lo if limit is None else max(lo, stop - limit)
+        if stop <= begin:
+            return {'draws': [], 'total': total, 'next_cursor': None}
+
+        return {
+            'draws': self.draws[begin:stop][::-1],
+            'total': total,
+            'next_cursor': self.cursor(begin) if begin > lo else None
+        }
+
+
+class DrawStore:
+    """
+    In-memory store of draw results.
+    Structure of each draw: {'date': 'YYYY-MM-DD', 'type': str, 'numbers': [int], 'super': int (optional)}
+    """
+
+    def __init__(self, db=None):
+        self._partitions = {}  # Replaced as a whole on every write, never mutated
+        self._keys = set()
+        self._write_lock = threading.Lock()  # Serializes writers (refresh, backfill, manual entry)
+        self._listeners = []
+        self.db = db  # Optional DrawDatabase written through on every add
+        # Last database row loaded and the data_version it was read at (see sync)
+        self._db_rowid = 0
+        self._db_version = None
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        for partition in self._partitions.values():
+            yield from partition.draws
+
+    def __contains__(self, draw):
+        return draw_key(draw) in self._keys
+
+    def add_listener(self, listener):
+        """
+        Registers listener(store, added), called after each write that added
+        draws, while writes are still held off.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, added):
+        if added:
+            for listener in self._listeners:
+                listener(self, added)
+
+    def partition(self, game_type):
+        """
+        Current snapshot of a game. It is never modified after being
+        published, so it can be read without locking; writes publish a new one.
+        """
+        partition = self._partitions.get(game_type)
+        return partition if partition is not None else GamePartition(game_type)
+
+    def _apply(self, draws):
+        """
+        Inserts the new draws into copies of their partitions and publishes
+        them; draws failing validate_draw are skipped. Must be called with the
+        write lock held. Returns the draws added.
+        """
+        added, by_game, keys = [], {}, set()
+        for draw in draws:
+            try:
+                validate_draw(draw)
+            except ValueError:
+                # Out-of-range rows (e.g. persisted by an older version) would
+                # corrupt the accumulators; they are left out of the store
+                continue
+            key = draw_key(draw)
+            if key not in self._keys and key not in keys:
+                keys.add(key)
+                added.append(draw)
+                by_game.setdefault(draw['type'], []).append(draw)
+
+        staged = {}
+        for game_type, game_draws in by_game.items():
+            bulk = len(game_draws) > BULK_INSERT
+            partition = self.partition(game_type).copy(with_analytics=not bulk)
+            if bulk:
+                partition.insert_many(game_draws)
+            else:
+                for draw in game_draws:
+                    partition.insert(draw)
+            staged[game_type] = partition
+
+        if staged:
+            self._partitions = {**self._partitions, **staged}
+            self._keys.update(keys)
+        return added
+
+    def extend(self, draws):
+        """
+        Adds several draws, skipping duplicates.
+        Returns the list of draws that were actually added.
+        """
+        with self._write_lock:
+            added = self._apply(draws)
+            if self.db is not None:
+                self.db.insert_many(added)
+            self._notify(added)
+        return added
+
+    def load(self):
+        """
+        Loads the persisted history into memory without writing it back.
+        Returns the number of draws loaded.
+        """
+        if self.db is None:
+            return 0
+
+        with self._write_lock:
+            return self._load_new()
+
+    def sync(self):
+        """
+        Loads draws committed to the database by other processes, e.g. the
+        other workers of a multi-process server. Costs one PRAGMA query when
+        nothing changed. Returns the number of draws loaded.
+        """
+        if self.db is None or self.db.data_version() == self._db_version:
+            return 0
+
+        with self._write_lock:
+            return self._load_new()
+
+    def _load_new(self):
+        # Read the version first: a commit landing after it triggers another sync
+        self._db_version = self.db.data_version()
+        draws, self._db_rowid = self.db.load_after(self._db_rowid)
+        added = self._apply(draws)
+        self._notify(added)
+        return len(added)
+
+    def add(self, draw):
+        """
+        Adds a draw if it is not already stored.
+        Returns True if the draw was added, False if it was a duplicate.
+        """
+        return bool(self.extend([draw]))
+
+    def get(self, game_type):
+        """
+        Returns the draws for a game type sorted by date (oldest first).
+        The returned list is owned by the store and must not be modified.
+        """
+        return self.partition(game_type).draws
+
+    def date_range(self, game_type, start=None, end=None):
+        """
+        Returns the draws for a game type between two 'YYYY-MM-DD' dates (inclusive).
+        """
+        return self.partition(game_type).date_range(start, end)
+
+    def history_page(self, game_type, start=None, end=None, offset=0, limit=None, cursor=None):
+        """
+        Newest-first page of a game's draws; see GamePartition.page.
+        """
+        return self.partition(game_type).page(start, end, offset, limit, cursor)
+
+    def analytics(self, game_type):
+        """
+        Returns the incremental analytics accumulator for a game type.
+        """
+        return self.partition(game_type).analytics
+
+    def version(self, game_type):
+        """
+        Dataset version of a game type; changes whenever a draw is added to it.
+        """
+        return self.partition(game_type).version
+
+    def game_types(self):
+        return list(self._partitions)
+
+    def count(self, game_type):
+        return len(self.partition(game_type))
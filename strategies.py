@@ -0,0 +1,234 @@
+"""
+Prediction strategies for SW BALOTO.
+A strategy turns a StrategyState (counts, gaps and pair counts of a history)
+into sampling tables once, then draws tickets from those tables in NumPy
+batches. The app builds the tables once per dataset version; the backtest
+rebuilds them from the draws dated before each replayed draw.
+"""
+import numpy as np
+
+SUPER_POOL = 16
+
+# Numbers of a hot-cold ticket drawn from the hot side; the rest are cold
+HOT_PICKS = 3
+
+# How strongly the pair strategy favours numbers that co-occur with earlier picks
+PAIR_BOOST = 4.0
+
+
+class StrategyState:
+    """
+    What strategies may look at, as arrays indexed by number - 1:
+    number_counts (pool,), super_counts (16,), gaps and super_gaps (draws since
+    last seen), pair_counts (pool, pool) with the frequencies on the diagonal.
+    """
+
+    def __init__(self, pool, draws, number_counts, super_counts, gaps, super_gaps, pair_counts):
+        self.pool = pool
+        self.draws = draws
+        self.number_counts = number_counts
+        self.super_counts = super_counts
+        self.gaps = gaps
+        self.super_gaps = super_gaps
+        self.pair_counts = pair_counts
+
+    @classmethod
+    def from_analytics(cls, analytics):
+        """
+        State of a whole partition, from its GameAnalytics accumulators.
+        """
+        pool = analytics.max_num
+        number_counts = np.zeros(pool)
+        for num, freq in analytics.number_freq.items():
+            if 1 <= num <= pool:
+                number_counts[num - 1] = freq
+
+        super_counts = np.zeros(SUPER_POOL)
+        super_gaps = np.full(SUPER_POOL, float(len(analytics)))
+        for num, freq in analytics.super_freq.items():
+            if 1 <= num <= SUPER_POOL:
+                super_counts[num - 1] = freq
+                super_gaps[num - 1] = analytics.draws_since(analytics.super_last_seen[num])
+
+        gaps = np.zeros(pool)
+        for entry in analytics.gaps():
+            gaps[entry['number'] - 1] = entry['gap']
+
+        pair_counts = analytics.pair_counts[1:pool + 1, 1:pool + 1].astype(np.float64)
+
+        return cls(pool, len(analytics), number_counts, super_counts, gaps, super_gaps, pair_counts)
+
+
+# ============================================
+# SAMPLING
+# ============================================
+
+def sample_tickets(rng, weights, count, k):
+    """
+    `count` draws of k distinct indices, each drawn with probability
+    proportional to its weight among those left, as a (count, k) array.
+    Uses an exponential race: the k smallest of E_i / w_i with E_i ~ Exp(1).
+    `weights` may be one vector or one row per draw.
+    """
+    with np.errstate(divide='ignore'):
+        keys = rng.standard_exponential((count, np.shape(weights)[-1]), dtype=np.float32) / \
+            np.asarray(weights, dtype=np.float32)
+    return np.argpartition(keys, k - 1, axis=1)[:, :k]
+
+
+def sample_one(rng, weights, count):
+    """
+    `count` independent indices drawn with probability proportional to weights.
+    """
+    cumulative = np.cumsum(weights)
+    return np.searchsorted(cumulative, rng.random(count) * cumulative[-1], side='right')
+
+
+def _sample_rows(rng, weights):
+    """
+    One index per row of a (count, n) weight matrix.
+    """
+    cumulative = np.cumsum(weights, axis=1)
+    targets = rng.random(len(weights)) * cumulative[:, -1]
+    return np.minimum((cumulative <= targets[:, None]).sum(axis=1), weights.shape[1] - 1)
+
+
+# ============================================
+# STRATEGIES
+# ============================================
+
+class Strategy:
+    """
+    Base strategy: fixed weights per number and per super balota.
+    Subclasses provide number_weights and may override tables and sample.
+    """
+    name = None
+    description = ''
+    uses_pairs = False  # Whether tables read state.pair_counts
+
+    def number_weights(self, state):
+        raise NotImplementedError
+
+    def super_weights(self, state):
+        return state.super_counts + 1.0
+
+    def tables(self, state):
+        return {'numbers': self.number_weights(state), 'super': self.super_weights(state)}
+
+    def sample(self, tables, rng, count):
+        """
+        (count, 5) array of distinct number indices (number - 1).
+        """
+        return sample_tickets(rng, tables['numbers'], count, 5)
+
+
+class FrequencyStrategy(Strategy):
+    name = 'frequency'
+    description = 'Más frecuentes: peso = frecuencia + 1'
+
+    def number_weights(self, state):
+        return state.number_counts + 1.0
+
+
+class GapStrategy(Strategy):
+    name = 'gap'
+    description = 'Atrasados: peso = sorteos sin aparecer + 1'
+
+    def number_weights(self, state):
+        return state.gaps + 1.0
+
+    def super_weights(self, state):
+        return state.super_gaps + 1.0
+
+
+class HotColdStrategy(Strategy):
+    name = 'hot-cold'
+    description = f'Mixto: {HOT_PICKS} calientes y {5 - HOT_PICKS} fríos'
+
+    def number_weights(self, state):
+        return state.number_counts + 1.0
+
+    def tables(self, state):
+        tables = super().tables(state)
+        tables['cold'] = state.number_counts.max(initial=0) - state.number_counts + 1.0
+        return tables
+
+    def sample(self, tables, rng, count):
+        hot = sample_tickets(rng, tables['numbers'], count, HOT_PICKS)
+        # Cold picks exclude the numbers already taken
+        cold_weights = np.tile(tables['cold'], (count, 1))
+        np.put_along_axis(cold_weights, hot, 0.0, axis=1)
+        cold = sample_tickets(rng, cold_weights, count, 5 - HOT_PICKS)
+        return np.concatenate([hot, cold], axis=1)
+
+
+class PairStrategy(Strategy):
+    name = 'pair'
+    description = 'Parejas: favorece números que salen junto a los ya elegidos'
+    uses_pairs = True
+
+    def number_weights(self, state):
+        return state.number_counts + 1.0
+
+    def tables(self, state):
+        tables = super().tables(state)
+        # affinity[i, j]: share of the draws with i that also had j
+        affinity = state.pair_counts / np.maximum(state.number_counts, 1.0)[:, None]
+        np.fill_diagonal(affinity, 0.0)
+        tables['affinity'] = affinity
+        return tables
+
+    def sample(self, tables, rng, count):
+        base, affinity = tables['numbers'], tables['affinity']
+        picks = np.empty((count, 5), dtype=np.int64)
+        boost = np.zeros((count, len(base)))
+        for k in range(5):
+            weights = base * (1.0 + PAIR_BOOST * boost)
+            if k:
+                np.put_along_axis(weights, picks[:, :k], 0.0, axis=1)
+            picks[:, k] = _sample_rows(rng, weights)
+            boost += affinity[picks[:, k]]
+        return picks
+
+
+class UniformStrategy(Strategy):
+    name = 'uniform'
+    description = 'Aleatorio uniforme'
+
+    def number_weights(self, state):
+        return np.ones(state.pool)
+
+    def super_weights(self, state):
+        return np.ones(SUPER_POOL)
+
+
+STRATEGIES = {strategy.name: strategy for strategy in (
+    FrequencyStrategy(), GapStrategy(), HotColdStrategy(), PairStrategy(), UniformStrategy())}
+
+DEFAULT_STRATEGY = 'frequency'
+
+
+def get_strategy(name):
+    """
+    Returns a registered strategy. Raises ValueError for unknown names.
+    """
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {name}. Available: {', '.join(STRATEGIES)}")
+    return STRATEGIES[name]
+
+
+def iter_tickets(strategy, tables, rng, count, with_super, batch_size=1000):
+    """
+    Yields count tickets ({'numbers': [...], 'super_balota': n}) drawn in batches.
+    """
+    remaining = count
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        numbers = np.sort(strategy.sample(tables, rng, size), axis=1) + 1
+        supers = sample_one(rng, tables['super'], size) + 1 if with_super else None
+        for i, row in enumerate(numbers.tolist()):
+            ticket = {'numbers': row}
+            if with_super:
+                ticket['super_balota'] = int(supers[i])
+            yield ticket
+        remaining -= size
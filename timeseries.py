@@ -0,0 +1,90 @@
+"""
+Cumulative number frequencies over time, stored compactly.
+Each draw is kept as its five numbers (the delta it adds to the counts) and
+the full count vector is checkpointed every CHECKPOINT_INTERVAL draws, so
+the counts as of any draw are one checkpoint plus at most that many deltas.
+Draws that share a date each keep their own point in the series.
+"""
+import bisect
+import math
+
+import numpy as np
+
+# Draws between stored count vectors
+CHECKPOINT_INTERVAL = 256
+
+
+class FrequencySeries:
+    """
+    dates: one 'YYYY-MM-DD' per draw, ascending; numbers: (N, 5) uint8;
+    checkpoints[k]: counts over the first k * interval draws, indexed by number.
+    """
+
+    def __init__(self, dates, numbers, max_num, interval=CHECKPOINT_INTERVAL):
+        self.dates = dates
+        self.numbers = numbers
+        self.max_num = max_num
+        self.interval = interval
+
+        n = len(numbers)
+        size = max(max_num, int(numbers.max(initial=0))) + 1
+        blocks = math.ceil(n / interval)
+        # Counts added by each block of draws, shifted by one so row 0 is empty
+        keys = (np.arange(n).repeat(numbers.shape[1]) // interval + 1) * size + numbers.ravel()
+        per_block = np.bincount(keys, minlength=(blocks + 1) * size).reshape(blocks + 1, size)
+        self.checkpoints = np.cumsum(per_block, axis=0).astype(np.int32)
+
+    def __len__(self):
+        return len(self.dates)
+
+    @classmethod
+    def from_draws(cls, draws, max_num, interval=CHECKPOINT_INTERVAL):
+        """
+        Builds the series from date-sorted draws; draws without a date are skipped.
+        """
+        dated = [draw for draw in draws if draw.get('date')]
+        numbers = np.array([draw['numbers'] for draw in dated], dtype=np.uint8).reshape(len(dated), 5)
+        return cls([draw['date'] for draw in dated], numbers, max_num, interval)
+
+    def counts_at(self, index):
+        """
+        Count vector (indexed by number) after the draw at `index`;
+        all zeros for index -1.
+        """
+        stop = index + 1
+        block = stop // self.interval
+        counts = self.checkpoints[block].astype(np.int64)
+        counts += np.bincount(self.numbers[block * self.interval:stop].ravel(), minlength=len(counts))
+        return counts
+
+    def index_at(self, date):
+        """
+        Index of the last draw on or before `date` (-1 if there is none).
+        """
+        return bisect.bisect_right(self.dates, date) - 1
+
+    def sample_indices(self, points):
+        """
+        Up to `points` (at least 2) draw indices spread evenly over the
+        series, always including the first and the last draw.
+        """
+        if points < 2:
+            raise ValueError('points must be at least 2')
+        if not len(self):
+            return []
+        if points >= len(self):
+            return list(range(len(self)))
+        return np.unique(np.linspace(0, len(self) - 1, points).round().astype(np.int64)).tolist()
+
+    def to_dict(self, indices):
+        """
+        Dense cumulative counts at the given indices:
+        {'dates': [...], 'numbers': [1..max_num], 'counts': [[...] per date], 'total_draws': int}.
+        """
+        counts = [self.counts_at(i)[1:self.max_num + 1].tolist() for i in indices]
+        return {
+            'dates': [self.dates[i] for i in indices],
+            'numbers': list(range(1, self.max_num + 1)),
+            'counts': counts,
+            'total_draws': len(self)
+        }
@@ -0,0 +1,265 @@
+"""
+NumPy-backed versions of the logic.py statistics.
+Draws are packed into a DrawMatrix (an N x 5 uint8 array of numbers, a super
+ball column and date ordinals) and every calculate_* function is computed with
+array operations. Results are identical to the pure-Python versions.
+"""
+from datetime import date
+
+import numpy as np
+
+import logic
+from metrics import timed
+
+# Pairs (i, j) of columns of a sorted row, in the order logic.py visits them
+PAIR_COLUMNS = [(i, j) for i in range(5) for j in range(i + 1, 5)]
+
+
+class DrawMatrix:
+    """
+    Compact representation of a draw history.
+    numbers: (N, 5) uint8, supers: (N,) uint8 with 0 meaning no super ball,
+    ordinals: (N,) int32 date ordinals with 0 meaning unknown date.
+    """
+
+    def __init__(self, numbers, supers, ordinals):
+        self.numbers = numbers
+        self.supers = supers
+        self.ordinals = ordinals
+
+    def __len__(self):
+        return len(self.numbers)
+
+    @classmethod
+    def from_history(cls, history):
+        n = len(history)
+        numbers = np.array([draw['numbers'] for draw in history], dtype=np.uint8).reshape(n, 5)
+        supers = np.array([draw.get('super') or 0 for draw in history], dtype=np.uint8)
+        ordinals = np.array([_date_ordinal(draw.get('date', '')) for draw in history], dtype=np.int32)
+        return cls(numbers, supers, ordinals)
+
+    def sorted_numbers(self):
+        """
+        Numbers of each draw in ascending order.
+        """
+        return np.sort(self.numbers, axis=1)
+
+    def newest_first(self):
+        """
+        Row order equivalent to sorted(history, key=date, reverse=True).
+        """
+        return np.argsort(-self.ordinals, kind='stable')
+
+    def oldest_first(self):
+        """
+        Row order equivalent to sorted(history, key=date).
+        """
+        return np.argsort(self.ordinals, kind='stable')
+
+
+def _date_ordinal(date_str):
+    try:
+        return date.fromisoformat(date_str).toordinal()
+    except (TypeError, ValueError):
+        return 0
+
+
+def _ordinal_to_date(ordinal):
+    return date.fromordinal(ordinal).isoformat() if ordinal else 'Unknown'
+
+
+def _max_number(game_type):
+    return 43 if game_type == 'baloto' else 39
+
+
+def _first_index(flat, values):
+    """
+    Index of the first occurrence in `flat` of each of `values`.
+    """
+    positions = np.flatnonzero(np.isin(flat, values))
+    uniq, idx = np.unique(flat[positions], return_index=True)
+    lookup = dict(zip(uniq.tolist(), positions[idx].tolist()))
+    return np.array([lookup[v] for v in values.tolist()], dtype=np.int64)
+
+
+def _most_common(counts, k, flat):
+    """
+    Equivalent of Counter(flat).most_common(k) given counts = bincount(flat).
+    Ties are broken by first appearance in `flat`, as Counter does.
+    """
+    present = np.flatnonzero(counts)
+    if len(present) == 0:
+        return []
+    k = min(k, len(present))
+    threshold = np.partition(counts[present], -k)[-k]
+    candidates = present[counts[present] >= threshold]
+    first = _first_index(flat, candidates)
+    order = np.lexsort((first, -counts[candidates]))[:k]
+    return [(int(v), int(counts[v])) for v in candidates[order]]
+
+
+def _counts_dict(counts):
+    return {int(num): int(counts[num]) for num in np.flatnonzero(counts)}
+
+
+def pair_matrix(matrix, max_num, chunk_size=65536):
+    """
+    Co-occurrence matrix C where C[a, b] is the number of draws containing
+    both a and b (the diagonal holds single-number frequencies).
+    Computed as a one-hot product X^T X, in chunks to bound memory.
+    """
+    size = max_num + 1
+    result = np.zeros((size, size), dtype=np.int64)
+    for start in range(0, len(matrix), chunk_size):
+        rows = matrix.numbers[start:start + chunk_size]
+        onehot = np.zeros((len(rows), size), dtype=np.float32)
+        onehot[np.arange(len(rows))[:, None], rows] = 1
+        result += (onehot.T @ onehot).astype(np.int64)
+    return result
+
+
+# ============================================
+# VECTORIZED ANALYTICS FUNCTIONS
+# ============================================
+
+@timed('vectorized.calculate_frequencies')
+def calculate_frequencies(matrix):
+    if not len(matrix):
+        return {'numbers': {}, 'super': {}}
+
+    num_counts = np.bincount(matrix.numbers.ravel())
+    super_counts = np.bincount(matrix.supers)
+    super_counts[0] = 0
+
+    return {'numbers': _counts_dict(num_counts), 'super': _counts_dict(super_counts)}
+
+
+@timed('vectorized.calculate_hot_cold_numbers')
+def calculate_hot_cold_numbers(matrix, game_type):
+    if not len(matrix):
+        return {'hot': [], 'cold': [], 'neutral': []}
+
+    max_num = _max_number(game_type)
+    num_counts = np.bincount(matrix.numbers.ravel(), minlength=max_num + 1)
+    return logic.classify_hot_cold(_counts_dict(num_counts), len(matrix), max_num)
+
+
+@timed('vectorized.calculate_number_gaps')
+def calculate_number_gaps(matrix, game_type):
+    if not len(matrix):
+        return []
+
+    max_num = _max_number(game_type)
+    n = len(matrix)
+    order = matrix.newest_first()
+    flat = matrix.numbers[order].ravel()
+
+    # First row (newest first) in which each number appears
+    uniq, first = np.unique(flat, return_index=True)
+    first_row = dict(zip(uniq.tolist(), (first // 5).tolist()))
+    ordinals = matrix.ordinals[order]
+
+    result = []
+    for num in range(1, max_num + 1):
+        row = first_row.get(num)
+        if row is None:
+            result.append({'number': num, 'gap': n, 'last_seen': None})
+        else:
+            result.append({'number': num, 'gap': row, 'last_seen': _ordinal_to_date(int(ordinals[row]))})
+
+    result.sort(key=lambda x: x['gap'], reverse=True)
+    return result
+
+
+@timed('vectorized.calculate_pair_frequency')
+def calculate_pair_frequency(matrix, game_type):
+    if not len(matrix):
+        return []
+
+    max_num = max(_max_number(game_type), int(matrix.numbers.max()))
+    size = max_num + 1
+    counts = np.triu(pair_matrix(matrix, max_num), 1).ravel()
+
+    # Pair codes in the same order as the nested loops in logic.py, for tie-breaking
+    sorted_nums = matrix.sorted_numbers().astype(np.int64)
+    codes = np.stack([sorted_nums[:, i] * size + sorted_nums[:, j] for i, j in PAIR_COLUMNS], axis=1).ravel()
+
+    top = _most_common(counts, 20, codes)
+    return [{'pair': [code // size, code % size], 'frequency': freq} for code, freq in top]
+
+
+@timed('vectorized.calculate_sum_distribution')
+def calculate_sum_distribution(matrix, game_type):
+    if not len(matrix):
+        return {'distribution': [], 'average': 0, 'min': 0, 'max': 0, 'ranges': []}
+
+    sums = matrix.numbers.sum(axis=1, dtype=np.int64)
+    return logic.summarize_sum_counts(_counts_dict(np.bincount(sums)))
+
+
+@timed('vectorized.calculate_trend_analysis')
+def calculate_trend_analysis(matrix, game_type):
+    if len(matrix) < 5:
+        return {'trending_up': [], 'trending_down': [], 'stable': []}
+
+    max_num = _max_number(game_type)
+    order = matrix.oldest_first()
+    mid = len(order) // 2
+
+    first = np.bincount(matrix.numbers[order[:mid]].ravel(), minlength=max_num + 1)
+    second = np.bincount(matrix.numbers[order[mid:]].ravel(), minlength=max_num + 1)
+
+    return logic.classify_trends(_counts_dict(first), _counts_dict(second), mid, len(order) - mid, max_num)
+
+
+@timed('vectorized.calculate_position_analysis')
+def calculate_position_analysis(matrix, game_type):
+    if not len(matrix):
+        return []
+
+    sorted_nums = matrix.sorted_numbers()
+    result = []
+    for pos in range(5):
+        column = sorted_nums[:, pos]
+        top_5 = _most_common(np.bincount(column), 5, column)
+        result.append({
+            'position': pos + 1,
+            'top_numbers': [{'number': num, 'frequency': freq} for num, freq in top_5]
+        })
+
+    return result
+
+
+@timed('vectorized.get_super_balota_analysis')
+def get_super_balota_analysis(matrix):
+    if not len(matrix):
+        return {'frequencies': [], 'hot': [], 'cold': [], 'gaps': []}
+
+    supers = matrix.supers[matrix.newest_first()]
+    present = np.flatnonzero(supers)
+    uniq, first = np.unique(supers[present], return_index=True)
+    counts = np.bincount(supers)
+
+    # Insertion order of the Counter in logic.py: first appearance, newest first
+    last_seen = {int(num): int(present[idx]) for idx, num in sorted(zip(first, uniq))}
+    super_freq = {num: int(counts[num]) for num in last_seen}
+
+    return logic.summarize_super(super_freq, last_seen, len(matrix))
+
+
+@timed('vectorized.get_comprehensive_prediction_data')
+def get_comprehensive_prediction_data(matrix, game_type):
+    """
+    Vectorized equivalent of logic.get_comprehensive_prediction_data.
+    """
+    return {
+        'frequency_chart': calculate_frequencies(matrix),
+        'hot_cold': calculate_hot_cold_numbers(matrix, game_type),
+        'gaps': calculate_number_gaps(matrix, game_type),
+        'pairs': calculate_pair_frequency(matrix, game_type),
+        'sum_distribution': calculate_sum_distribution(matrix, game_type),
+        'trends': calculate_trend_analysis(matrix, game_type),
+        'position_analysis': calculate_position_analysis(matrix, game_type),
+        'super_analysis': get_super_balota_analysis(matrix) if game_type == 'baloto' else None,
+        'total_draws': len(matrix)
+    }